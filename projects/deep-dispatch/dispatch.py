@@ -3,12 +3,14 @@ Deep Dispatch — a Gemini-powered research agent.
 
 Usage:
     python dispatch.py "What is the current state of spatial computing hardware?"
+    python dispatch.py --headless --low-score retry "..."   # no prompts; see policy.py
 
 The agent runs in three stages:
 
-  Stage 1 — Source selection (Gemini, JSON output)
-    Gemini reads your NotebookLM sources manifest and identifies which projects
-    are relevant to the research question. You confirm before they're included.
+  Stage 1 — Source selection (local index, then Gemini, JSON output)
+    A local TF-IDF index over your NotebookLM sources (source_index.py) picks
+    the closest few projects in milliseconds; Gemini re-ranks just that short
+    list. You confirm before they're included, or a policy does (--headless).
 
   Stage 2 — Deep research (Gemini + Google Search grounding)
     Gemini runs a comprehensive web research session with your selected sources
@@ -20,18 +22,35 @@ The agent runs in three stages:
   Stage 3 — Delivery (Python, no LLM)
     The report is converted to a styled PDF and emailed to your reMarkable.
     The document appears on your device within seconds.
+
+The stages run on a small dependency scheduler (pipeline.py), so the PDF is
+rendered while the report is still being scored. Stage timings are printed at
+the end of each run.
 """
 
+import argparse
+import itertools
 import json
 import os
 import sys
+import uuid
+from pathlib import Path
 from typing import Optional
 
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
-from tools import build_context, load_manifest, send_to_remarkable, to_pdf
+from eval import EvalResult, evaluate
+from manifest import Manifest
+from pipeline import Pipeline, Stage
+from policy import LOW_SCORE_ACTIONS, DecisionLog, Policy, confirm_sources, decide_delivery
+from source_index import get_index
+from tools import REPORTS_DIR, _slugify, build_context, load_manifest, send_to_remarkable, to_pdf
+
+# resilience.py is shared with research-scout and lives in the repo's shared/ directory
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from resilience import log_retry, retry_call  # noqa: E402
 
 load_dotenv()
 
@@ -39,6 +58,13 @@ load_dotenv()
 SELECTION_MODEL = "gemini-2.5-flash"
 RESEARCH_MODEL = "gemini-2.5-flash"
 
+# Candidates from the local source index that go on to Gemini for re-ranking
+SELECT_TOP_K = int(os.environ.get("DISPATCH_SELECT_TOP_K", "8"))
+# Set to 0 to skip the Gemini re-rank and take the index's candidates as they are
+RERANK = os.environ.get("DISPATCH_RERANK", "1") != "0"
+# Without re-ranking, the least similarity (0–1) for a source to be selected
+MIN_SIMILARITY = float(os.environ.get("DISPATCH_MIN_SIMILARITY", "0.05"))
+
 
 # ── Stage 1: Source selection ─────────────────────────────────────────────────
 
@@ -56,32 +82,57 @@ If none are relevant, return an empty array: []
 """
 
 
-def select_sources(client: genai.Client, question: str, projects: list[dict]) -> list[str]:
-    """Ask Gemini which NotebookLM sources are relevant to the question."""
+def select_sources(
+    client: genai.Client,
+    question: str,
+    projects: Manifest,
+    rerank: bool = RERANK,
+) -> list[str]:
+    """Pick the NotebookLM sources relevant to the question.
+
+    The local index shortlists SELECT_TOP_K candidates; Gemini then chooses
+    among them. Small manifests go to Gemini whole, as before.
+    """
     if not projects:
         return []
 
+    candidates = get_index(projects).search(question, k=SELECT_TOP_K)
+    if not rerank:
+        return [pid for pid, score in candidates if score >= MIN_SIMILARITY]
+
+    shortlist = list(projects)
+    if len(projects) > SELECT_TOP_K:
+        shortlist = [projects.get(pid) for pid, _ in candidates]
+        if not shortlist:
+            return []
+
     project_list = "\n".join(
-        f"- id: \"{p['id']}\"  title: \"{p['title']}\"  topics: {p['topics']}"
-        for p in projects
+        f"- id: \"{p.id}\"  title: \"{p.title}\"  topics: {list(p.topics)}"
+        for p in shortlist
     )
 
-    response = client.models.generate_content(
-        model=SELECTION_MODEL,
-        contents=SOURCE_SELECTION_PROMPT.format(
-            question=question,
-            project_list=project_list,
-        ),
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
+    response = retry_call(
+        lambda: client.models.generate_content(
+            model=SELECTION_MODEL,
+            contents=SOURCE_SELECTION_PROMPT.format(
+                question=question,
+                project_list=project_list,
+            ),
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+            ),
         ),
+        on_retry=log_retry("source selection"),
     )
 
     try:
         ids = json.loads(response.text)
-        return ids if isinstance(ids, list) else []
-    except (json.JSONDecodeError, AttributeError):
+    except (json.JSONDecodeError, AttributeError, TypeError):
         return []
+    if not isinstance(ids, list):
+        return []
+    known = {p.id for p in shortlist}
+    return [pid for pid in ids if pid in known]
 
 
 # ── Stage 2: Deep research ────────────────────────────────────────────────────
@@ -120,83 +171,163 @@ def deep_research(client: genai.Client, question: str, source_context: str) -> s
         source_context=source_context,
     )
 
-    response = client.models.generate_content(
-        model=RESEARCH_MODEL,
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            tools=[types.Tool(google_search=types.GoogleSearch())],
-            temperature=0.3,
+    response = retry_call(
+        lambda: client.models.generate_content(
+            model=RESEARCH_MODEL,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                tools=[types.Tool(google_search=types.GoogleSearch())],
+                temperature=0.3,
+            ),
         ),
+        on_retry=log_retry("deep research"),
     )
 
     return response.text
 
 
 # ── Main pipeline ─────────────────────────────────────────────────────────────
-
-def run(question: str) -> None:
+#
+#   sources  →  [ context → research ─┬─ eval ─┐ ]  →  deliver
+#                                     └─ pdf ──┘
+#
+# The bracketed stages run on the scheduler; the PDF is built while the eval
+# call is in flight. Choosing sources and deciding delivery may prompt, so they
+# run on the calling thread, where Ctrl-C at a prompt still stops the run. If
+# the report scores low and is held back, the PDF is simply not sent. A "retry"
+# decision runs research again, with the same sources and context.
+
+def run(question: str, policy: Optional[Policy] = None) -> str:
+    """Research, evaluate and deliver. Returns the final action: "deliver" or "hold"."""
+    policy = policy or Policy()
     client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+    log = DecisionLog(uuid.uuid4().hex[:12], question, policy)
 
     print(f"\nQuestion: {question}\n")
 
-    # Stage 1a: Load manifest
     projects = load_manifest()
+    sources = _choose_sources(client, question, projects, policy, log)
+    context = None
+
+    for attempt in itertools.count(1):
+        if context is None:
+            context_stage = Stage("context", lambda r: _load_context(sources, projects, question))
+        else:
+            print(f"\n  Retrying research (attempt {attempt})...")
+            context_stage = Stage("context", lambda r: context)
+
+        pipeline = Pipeline([
+            context_stage,
+            Stage("research", lambda r: _research(client, question, r["context"]), after=("context",)),
+            Stage("eval", lambda r: _evaluate(question, r["research"]), after=("research",)),
+            Stage("pdf", lambda r: to_pdf(r["research"], question), after=("research",)),
+        ])
+        results = pipeline.run()
+        context = results["context"]
+        print(f"\nStage timings:\n{pipeline.summary()}")
+
+        action = _deliver(question, results, policy, log, attempt)
+        if action != "retry":
+            break
+
+    if action == "deliver":
+        print(f"\nDone. Check your reMarkable.")
+    return action
+
+
+def _choose_sources(
+    client: genai.Client,
+    question: str,
+    projects: Manifest,
+    policy: Policy,
+    log: DecisionLog,
+) -> list[str]:
+    """Stage 1: pick sources and confirm them (by asking, or by policy)."""
     print(f"[1/3] Source selection ({len(projects)} project(s) in manifest)")
+    for problem in projects.problems:
+        print(f"      ⚠ {problem}")
+    if not projects:
+        return []
 
-    # Stage 1b: Ask Gemini which sources are relevant
-    selected_ids: list[str] = []
-    if projects:
-        suggested = select_sources(client, question, projects)
+    suggested = select_sources(client, question, projects)
+    if not suggested:
+        print("      No sources selected as relevant")
+        return []
 
-        if suggested:
-            print(f"      Relevant: {', '.join(suggested)}")
-            answer = input("      Include these? [Y/n] ").strip().lower()
-            if answer != "n":
-                selected_ids = suggested
-        else:
-            print("      No sources selected as relevant")
+    print(f"      Relevant: {', '.join(suggested)}")
+    scores = get_index(projects).similarity(question, suggested)
+    return confirm_sources(policy, log, suggested, scores)
 
-    # Stage 1c: Load source content
-    source_context = build_context(selected_ids, projects)
+
+def _load_context(selected_ids: list[str], projects: Manifest, question: str) -> str:
+    source_context = build_context(selected_ids, projects, question)
     if source_context:
         print(f"      Loaded {len(selected_ids)} source(s) into context")
+    return source_context
+
 
-    # Stage 2: Deep research
+def _research(client: genai.Client, question: str, source_context: str) -> str:
+    """Stage 2: deep research."""
     print("\n[2/3] Running deep research...")
     report = deep_research(client, question, source_context)
     print("      Done")
+    return report
 
-    # Stage 2.5: Eval — score the report before delivery
+
+def _evaluate(question: str, report: str) -> EvalResult:
+    """Stage 2.5: score the report before delivery."""
     print("\n[eval] Scoring report...")
-    from eval import evaluate
     result = evaluate(question, report)
     print(result.display())
+    return result
+
 
-    if result.score < 3.0:
+def _deliver(question: str, results: dict, policy: Policy, log: DecisionLog, attempt: int) -> str:
+    """Stage 3: send the PDF, hold the report back, or ask for a retry. Returns the action."""
+    result: EvalResult = results["eval"]
+    if result.score < policy.low_score_threshold:
         print(f"\n  ⚠  Score is low ({result.score:.1f}/5).")
-        answer = input("  Deliver anyway? [y/N] ").strip().lower()
-        if answer != "y":
-            # Save the report locally so it's not lost
-            REPORTS_DIR = Path(__file__).parent / "reports"
-            REPORTS_DIR.mkdir(exist_ok=True)
-            from tools import _slugify
-            md_path = REPORTS_DIR / f"{_slugify(question)}.md"
-            md_path.write_text(report, encoding="utf-8")
-            print(f"  Report saved locally: {md_path.name}")
-            print("  Delivery skipped.")
-            return
-
-    # Stage 3: Deliver
+
+    action = decide_delivery(policy, log, result.score, attempt)
+    if action == "retry":
+        return action
+    if action == "hold":
+        # Save the report locally so it's not lost
+        REPORTS_DIR.mkdir(exist_ok=True)
+        md_path = REPORTS_DIR / f"{_slugify(question)}.md"
+        md_path.write_text(results["research"], encoding="utf-8")
+        print(f"  Report saved locally: {md_path.name}")
+        print("  Delivery skipped.")
+        return action
+
     print("\n[3/3] Delivering to reMarkable...")
-    pdf_path = to_pdf(report, question)
-    send_to_remarkable(pdf_path, question)
+    send_to_remarkable(results["pdf"], question)
+    return action
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Research a question and deliver the report to reMarkable.")
+    parser.add_argument("question", nargs="+", help="the research question")
+    parser.add_argument("--headless", action="store_true", help="never prompt; decide by policy")
+    parser.add_argument(
+        "--min-source-score", type=float,
+        help="headless: include suggested sources with at least this similarity (0–1)",
+    )
+    parser.add_argument(
+        "--low-score", choices=LOW_SCORE_ACTIONS,
+        help="headless: what to do with a report scored under 3.0",
+    )
+    parser.add_argument("--max-retries", type=int, help="headless: research re-runs for --low-score retry")
+    args = parser.parse_args()
 
-    print(f"\nDone. Check your reMarkable.")
+    overrides = {
+        "min_source_score": args.min_source_score,
+        "low_score_action": args.low_score,
+        "max_retries": args.max_retries,
+    }
+    policy = Policy(headless=args.headless, **{k: v for k, v in overrides.items() if v is not None})
+    run(" ".join(args.question), policy)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print('Usage: python dispatch.py "your research question"')
-        sys.exit(1)
-
-    run(" ".join(sys.argv[1:]))
+    main()
@@ -28,6 +28,9 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from resilience import log_retry, retry_call  # noqa: E402
+
 load_dotenv()
 
 EVAL_MODEL = "gemini-2.5-flash"
@@ -120,17 +123,20 @@ def _llm_score(question: str, report: str) -> dict:
     client = genai.Client(api_key=os.environ["GEMINI_API_KEY"])
     excerpt = report[:EVAL_EXCERPT_CHARS]
 
-    response = client.models.generate_content(
-        model=EVAL_MODEL,
-        contents=EVAL_PROMPT.format(
-            question=question,
-            chars=EVAL_EXCERPT_CHARS,
-            excerpt=excerpt,
-        ),
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            temperature=0,  # deterministic scoring
+    response = retry_call(
+        lambda: client.models.generate_content(
+            model=EVAL_MODEL,
+            contents=EVAL_PROMPT.format(
+                question=question,
+                chars=EVAL_EXCERPT_CHARS,
+                excerpt=excerpt,
+            ),
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                temperature=0,  # deterministic scoring
+            ),
         ),
+        on_retry=log_retry("eval scoring"),
     )
 
     try:
@@ -0,0 +1,143 @@
+"""
+The NotebookLM sources manifest.
+
+Entries come from sources/manifest.json and, for large knowledge bases, from any
+number of shard files in sources/manifest.d/*.json (each a JSON list in the same
+format). load_manifest() returns a Manifest: validated Project records plus an
+id index, so looking a project up is a dict access rather than a scan.
+
+Loading is cached on file mtimes. Each file is parsed only when it is first
+needed or has changed since, so adding one shard re-reads one shard, and a run
+with no changes re-reads nothing.
+
+Validation happens up front: entries missing a field, duplicate ids and
+source files that don't exist are listed in Manifest.problems. Invalid entries
+and duplicates are skipped; entries with a missing file are kept, since the
+file may be added later.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+SOURCES_DIR = BASE_DIR / "sources"
+
+REQUIRED_FIELDS = ("id", "title", "file")
+
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    id: str
+    title: str
+    topics: tuple[str, ...]
+    file: str
+
+    @property
+    def path(self) -> Path:
+        return BASE_DIR / self.file
+
+
+class Manifest:
+    def __init__(self, projects: list[Project], problems: list[str]):
+        self.projects = projects
+        self.problems = problems
+        self.by_id = {p.id: p for p in projects}
+
+    def get(self, project_id: str) -> Project | None:
+        return self.by_id.get(project_id)
+
+    def __iter__(self):
+        return iter(self.projects)
+
+    def __len__(self) -> int:
+        return len(self.projects)
+
+    @cached_property
+    def digest(self) -> str:
+        """Hash of every entry, for caches derived from the manifest."""
+        h = hashlib.sha256()
+        for p in self.projects:
+            h.update(json.dumps([p.id, p.title, p.topics, p.file]).encode("utf-8"))
+        return h.hexdigest()
+
+
+def _parse(path: Path) -> tuple[list[Project], list[str]]:
+    """Projects in one manifest file, and problems with its entries."""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        return [], [f"{path.name}: expected a JSON list of projects"]
+
+    projects, problems = [], []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            problems.append(f"{path.name}[{i}]: not an object")
+            continue
+        missing = [k for k in REQUIRED_FIELDS if not isinstance(entry.get(k), str) or not entry[k]]
+        if missing:
+            problems.append(f"{path.name}[{i}]: missing {', '.join(missing)}")
+            continue
+        topics = entry.get("topics", [])
+        projects.append(Project(
+            id=entry["id"],
+            title=entry["title"],
+            topics=tuple(topics) if isinstance(topics, list) else (str(topics),),
+            file=entry["file"],
+        ))
+    return projects, problems
+
+
+# ── Cached loading ────────────────────────────────────────────────────────────
+
+# path → (mtime_ns, size, parsed projects, problems)
+_files: dict[Path, tuple[int, int, list[Project], list[str]]] = {}
+_manifest: tuple[tuple, Manifest] | None = None
+
+
+def _manifest_files(sources_dir: Path) -> list[Path]:
+    files = []
+    if (sources_dir / "manifest.json").exists():
+        files.append(sources_dir / "manifest.json")
+    shard_dir = sources_dir / "manifest.d"
+    if shard_dir.is_dir():
+        files.extend(sorted(shard_dir.glob("*.json")))
+    return files
+
+
+def _load_file(path: Path) -> tuple[int, int, list[Project], list[str]]:
+    stat = path.stat()
+    cached = _files.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached
+    _files[path] = (stat.st_mtime_ns, stat.st_size, *_parse(path))
+    return _files[path]
+
+
+def load_manifest(sources_dir: Path = SOURCES_DIR) -> Manifest:
+    """The manifest and its shards, re-parsing only files that changed."""
+    global _manifest
+    loaded = [(path, _load_file(path)) for path in _manifest_files(sources_dir)]
+    stamp = tuple((path, mtime, size) for path, (mtime, size, _, _) in loaded)
+    if _manifest and _manifest[0] == stamp:
+        return _manifest[1]
+
+    projects: list[Project] = []
+    problems: list[str] = []
+    seen: dict[str, str] = {}
+    for path, (_, _, file_projects, file_problems) in loaded:
+        problems.extend(file_problems)
+        for project in file_projects:
+            if project.id in seen:
+                problems.append(f"{path.name}: duplicate id {project.id!r} (first in {seen[project.id]})")
+                continue
+            seen[project.id] = path.name
+            if not project.path.exists():
+                problems.append(f"{path.name}: {project.id!r} source file not found: {project.file}")
+            projects.append(project)
+
+    manifest = Manifest(projects, problems)
+    _manifest = (stamp, manifest)
+    return manifest
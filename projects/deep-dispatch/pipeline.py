@@ -0,0 +1,95 @@
+"""
+A small DAG scheduler for the Deep Dispatch stages.
+
+Each Stage names the stages it runs after. A stage starts on a worker thread as
+soon as everything it depends on has finished, so independent stages overlap:
+after deep research, the eval call and the PDF build run at the same time.
+Stages run off the calling thread, so nothing that prompts belongs in one:
+Ctrl-C can't interrupt a worker blocked in input().
+
+Every stage is timed; Pipeline.summary() shows when each one started and how
+long it took, relative to the start of the run.
+"""
+
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[dict[str, Any]], Any]   # called with the results of finished stages
+    after: tuple[str, ...] = ()
+
+
+@dataclass
+class StageTiming:
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Pipeline:
+    def __init__(self, stages: list[Stage], max_workers: int = 4):
+        names = {s.name for s in stages}
+        for stage in stages:
+            unknown = set(stage.after) - names
+            if unknown:
+                raise ValueError(f"stage {stage.name!r} runs after unknown stage(s): {', '.join(sorted(unknown))}")
+        self.stages = stages
+        self.max_workers = max_workers
+        self.results: dict[str, Any] = {}
+        self.timings: dict[str, StageTiming] = {}
+        self._started = 0.0
+
+    def run(self) -> dict[str, Any]:
+        """Run every stage once its dependencies are done. Returns results by stage name.
+
+        If a stage raises, no new stages start; stages already running finish,
+        then the exception is re-raised.
+        """
+        self._started = time.perf_counter()
+        waiting = list(self.stages)
+        running: dict[Future, Stage] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while waiting or running:
+                for stage in [s for s in waiting if all(d in self.results for d in s.after)]:
+                    waiting.remove(stage)
+                    running[pool.submit(self._run_stage, stage, dict(self.results))] = stage
+
+                if not running:
+                    raise ValueError(f"dependency cycle among: {', '.join(s.name for s in waiting)}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        self.results[stage.name] = future.result()
+                    except BaseException:
+                        wait(running)
+                        raise
+        return self.results
+
+    def _run_stage(self, stage: Stage, results: dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return stage.fn(results)
+        finally:
+            self.timings[stage.name] = StageTiming(start - self._started, time.perf_counter() - self._started)
+
+    def summary(self) -> str:
+        """Start offset and duration of each stage, in start order."""
+        lines = [f"  {'stage':<10} {'start s':>8} {'took s':>8}"]
+        for name, t in sorted(self.timings.items(), key=lambda item: item[1].start):
+            lines.append(f"  {name:<10} {t.start:>8.2f} {t.duration:>8.2f}")
+        if self.timings:
+            total = max(t.end for t in self.timings.values())
+            lines.append(f"  {'total':<10} {'':>8} {total:>8.2f}")
+        return "\n".join(lines)
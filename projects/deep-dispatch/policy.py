@@ -0,0 +1,115 @@
+"""
+Decision policies for Deep Dispatch.
+
+A run makes two judgment calls: which of the suggested sources to include, and
+whether to deliver a report the eval scored low. Interactively, dispatch.py
+asks. In headless mode (python dispatch.py --headless ...) a Policy decides, so
+runs can go unattended under a scheduler or a job queue:
+
+  sources    include suggested sources whose index similarity to the question
+             is at least min_source_score
+  low score  when the eval score is under low_score_threshold:
+               deliver — send it anyway
+               hold    — save the markdown locally and skip delivery
+               retry   — run research again (up to max_retries times), then hold
+
+Every decision, asked or automatic, is appended to a JSONL decision log
+(DISPATCH_DECISION_LOG, default reports/decisions.jsonl).
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+LOW_SCORE_ACTIONS = ("deliver", "hold", "retry")
+
+DECISION_LOG = Path(os.environ.get(
+    "DISPATCH_DECISION_LOG", Path(__file__).parent / "reports" / "decisions.jsonl"
+))
+
+
+@dataclass
+class Policy:
+    headless: bool = False
+    min_source_score: float = float(os.environ.get("DISPATCH_MIN_SOURCE_SCORE", "0.1"))
+    low_score_threshold: float = 3.0
+    low_score_action: str = os.environ.get("DISPATCH_LOW_SCORE_ACTION", "hold")
+    max_retries: int = int(os.environ.get("DISPATCH_MAX_RETRIES", "1"))
+
+    def __post_init__(self):
+        if self.low_score_action not in LOW_SCORE_ACTIONS:
+            raise ValueError(
+                f"low_score_action must be one of {', '.join(LOW_SCORE_ACTIONS)}, "
+                f"not {self.low_score_action!r}"
+            )
+
+
+class DecisionLog:
+    """Thread-safe, append-only JSONL writer for one run's decisions."""
+
+    def __init__(self, run_id: str, question: str, policy: Policy, path: Path = DECISION_LOG):
+        self.run_id = run_id
+        self.question = question
+        self.policy = policy
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, decision: str, outcome, **details) -> None:
+        record = {
+            "time": time.time(),
+            "run_id": self.run_id,
+            "question": self.question,
+            "decision": decision,
+            "mode": "headless" if self.policy.headless else "interactive",
+            "outcome": outcome,
+            **details,
+        }
+        if self.policy.headless:
+            record["policy"] = asdict(self.policy)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+def confirm_sources(
+    policy: Policy,
+    log: DecisionLog,
+    suggested: list[str],
+    scores: dict[str, float],
+) -> list[str]:
+    """The suggested sources to include, by policy or by asking."""
+    if policy.headless:
+        accepted = [pid for pid in suggested if scores.get(pid, 0.0) >= policy.min_source_score]
+        print(f"      Auto-accepted {len(accepted)} of {len(suggested)} (similarity ≥ {policy.min_source_score})")
+    else:
+        answer = input("      Include these? [Y/n] ").strip().lower()
+        accepted = [] if answer == "n" else suggested
+    log.write(
+        "sources",
+        accepted,
+        suggested=suggested,
+        scores={pid: round(scores.get(pid, 0.0), 4) for pid in suggested},
+    )
+    return accepted
+
+
+def decide_delivery(policy: Policy, log: DecisionLog, score: float, attempt: int) -> str:
+    """Decide what to do with a report: "deliver", "hold" or "retry".
+
+    attempt counts research runs so far, starting at 1.
+    """
+    if score >= policy.low_score_threshold:
+        action = "deliver"
+    elif not policy.headless:
+        answer = input("  Deliver anyway? [y/N] ").strip().lower()
+        action = "deliver" if answer == "y" else "hold"
+    elif policy.low_score_action == "retry" and attempt > policy.max_retries:
+        action = "hold"  # out of retries
+    else:
+        action = policy.low_score_action
+    log.write("delivery", action, score=round(score, 2), attempt=attempt)
+    return action
@@ -0,0 +1,131 @@
+"""
+Passage retrieval from NotebookLM source files.
+
+build_context used to paste every selected source file into the research prompt
+whole, so the prompt grew without limit and large sources could overflow it.
+Instead, each source file is split once into passages of a few paragraphs, and
+only the passages that best match the question (BM25) go into the prompt, up to
+a token budget (DISPATCH_CONTEXT_TOKENS).
+
+Passages and their term counts are cached in .cache/chunks/, one file per
+source, and recomputed only when the source file changes.
+"""
+
+import hashlib
+import json
+import math
+import os
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from manifest import BASE_DIR
+from source_index import tokenize
+
+CHUNK_DIR = BASE_DIR / ".cache" / "chunks"
+CONTEXT_TOKENS = int(os.environ.get("DISPATCH_CONTEXT_TOKENS", "6000"))
+
+# Target passage size; a paragraph longer than this is split on its own
+CHUNK_CHARS = 1200
+# Rough but stable: ~4 characters per token for English prose
+CHARS_PER_TOKEN = 4
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+
+@dataclass
+class Passage:
+    source: str           # project title
+    position: int         # index of the passage within its source
+    text: str
+    terms: dict[str, int]
+
+    @property
+    def tokens(self) -> int:
+        return len(self.text) // CHARS_PER_TOKEN
+
+
+def split_passages(text: str, size: int = CHUNK_CHARS) -> list[str]:
+    """Group consecutive paragraphs into passages of roughly size characters."""
+    passages, current = [], ""
+    for paragraph in (p.strip() for p in text.split("\n\n")):
+        if not paragraph:
+            continue
+        while len(paragraph) > size:
+            cut = paragraph.rfind(" ", 0, size)
+            cut = cut if cut > size // 2 else size
+            if current:
+                passages.append(current)
+                current = ""
+            passages.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if current and len(current) + len(paragraph) + 2 > size:
+            passages.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        passages.append(current)
+    return passages
+
+
+def load_passages(file_path: Path, title: str) -> list[Passage]:
+    """Passages of one source file, from the chunk cache when the file is unchanged."""
+    stat = file_path.stat()
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    cache_path = CHUNK_DIR / f"{hashlib.sha256(str(file_path.resolve()).encode()).hexdigest()[:24]}.json"
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached["stamp"] == stamp:
+            return [Passage(title, i, c["text"], c["terms"]) for i, c in enumerate(cached["chunks"])]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    text = file_path.read_text(encoding="utf-8", errors="replace")
+    chunks = [{"text": t, "terms": dict(Counter(tokenize(t)))} for t in split_passages(text)]
+    CHUNK_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"stamp": stamp, "chunks": chunks}), encoding="utf-8")
+    os.replace(tmp, cache_path)
+    return [Passage(title, i, c["text"], c["terms"]) for i, c in enumerate(chunks)]
+
+
+def bm25_scores(question: str, passages: list[Passage]) -> list[float]:
+    query = set(tokenize(question))
+    if not query or not passages:
+        return [0.0] * len(passages)
+    n = len(passages)
+    avg_len = sum(sum(p.terms.values()) for p in passages) / n or 1
+    df = Counter(t for p in passages for t in query if t in p.terms)
+    idf = {t: math.log(1 + (n - d + 0.5) / (d + 0.5)) for t, d in df.items()}
+
+    scores = []
+    for p in passages:
+        length = sum(p.terms.values())
+        score = 0.0
+        for t, weight in idf.items():
+            tf = p.terms.get(t, 0)
+            if tf:
+                score += weight * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_len))
+        scores.append(score)
+    return scores
+
+
+def select_passages(question: str, passages: list[Passage], budget: int = CONTEXT_TOKENS) -> list[Passage]:
+    """Best-matching passages that fit in budget tokens, in document order.
+
+    Passages that don't match the question at all are left out, so the prompt
+    only grows as far as the matches take it. If nothing matches, the opening
+    passages are used instead, since they tend to be a source's overview.
+    """
+    scores = bm25_scores(question, passages)
+    candidates = [i for i in range(len(passages)) if scores[i] > 0] or range(len(passages))
+    ranked = sorted(candidates, key=lambda i: (-scores[i], passages[i].position))
+    chosen, used = [], 0
+    for i in ranked:
+        if used + passages[i].tokens > budget:
+            continue
+        chosen.append(i)
+        used += passages[i].tokens
+    return [passages[i] for i in sorted(chosen)]
@@ -0,0 +1,126 @@
+"""
+Local TF-IDF index over the NotebookLM sources manifest.
+
+Stage 1 used to paste the whole manifest into a Gemini prompt on every run, so
+source selection cost a full LLM round trip that grew with every project added.
+SourceIndex scores the question against each project locally instead: title and
+topics (weighted up) plus the text of the project's source file, as TF-IDF
+vectors compared by cosine similarity. A query takes milliseconds, and Gemini
+only re-ranks the short list — or is skipped entirely (DISPATCH_RERANK=0).
+
+The index is stored in .cache/source-index.json and rebuilt only when the
+manifest or one of its source files changes.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+from manifest import BASE_DIR, Manifest, Project
+
+INDEX_PATH = BASE_DIR / ".cache" / "source-index.json"
+
+# Title and topics describe the whole project, so they count for more than body text
+FIELD_WEIGHT = 3
+# Source text read per project when building the index
+MAX_SOURCE_CHARS = 200_000
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = set(
+    "a an and are as at be by can do does for from how in is it of on or that the "
+    "this to was what when where which who why will with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [w for w in _WORD.findall(text.lower()) if len(w) > 1 and w not in _STOPWORDS]
+
+
+def _project_text(project: Project) -> str:
+    header = " ".join([project.title, *project.topics])
+    text = " ".join([header] * FIELD_WEIGHT)
+    if project.path.exists():
+        with open(project.path, encoding="utf-8", errors="ignore") as f:
+            text += " " + f.read(MAX_SOURCE_CHARS)
+    return text
+
+
+def _fingerprint(projects: Manifest) -> str:
+    """Changes whenever the manifest or any source file changes."""
+    h = hashlib.sha256(projects.digest.encode("utf-8"))
+    for project in projects:
+        try:
+            stat = project.path.stat()
+        except OSError:
+            continue
+        h.update(f"{project.file}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _weights(counts: Counter, idf: dict[str, float]) -> dict[str, float]:
+    """Unit-length TF-IDF vector with sublinear term frequency."""
+    vector = {t: (1 + math.log(n)) * idf[t] for t, n in counts.items() if t in idf}
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    return {t: w / norm for t, w in vector.items()} if norm else {}
+
+
+class SourceIndex:
+    def __init__(self, key: str, idf: dict[str, float], vectors: dict[str, dict[str, float]]):
+        self.key = key
+        self.idf = idf
+        self.vectors = vectors
+
+    @classmethod
+    def build(cls, projects: Manifest, key: str) -> "SourceIndex":
+        counts = {p.id: Counter(tokenize(_project_text(p))) for p in projects}
+        df = Counter(term for c in counts.values() for term in c)
+        n = len(projects)
+        idf = {term: math.log((1 + n) / (1 + d)) + 1 for term, d in df.items()}
+        return cls(key, idf, {pid: _weights(c, idf) for pid, c in counts.items()})
+
+    def search(self, question: str, k: int = 8) -> list[tuple[str, float]]:
+        """Top-k (project id, cosine similarity) pairs with any overlap, best first."""
+        scores = self.similarity(question, self.vectors)
+        return sorted((s for s in scores.items() if s[1] > 0), key=lambda s: s[1], reverse=True)[:k]
+
+    def similarity(self, question: str, ids) -> dict[str, float]:
+        """Cosine similarity of the question to each of the given project ids."""
+        query = _weights(Counter(tokenize(question)), self.idf)
+        return {
+            pid: sum(w * self.vectors.get(pid, {}).get(t, 0.0) for t, w in query.items())
+            for pid in ids
+        }
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"key": self.key, "idf": self.idf, "vectors": self.vectors}), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SourceIndex | None":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return cls(data["key"], data["idf"], data["vectors"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+_index: SourceIndex | None = None
+
+
+def get_index(projects: Manifest, path: Path = INDEX_PATH) -> SourceIndex:
+    """The index for this manifest: from memory, from disk, or freshly built."""
+    global _index
+    key = _fingerprint(projects)
+    if _index is None or _index.key != key:
+        index = SourceIndex.load(path)
+        if index is None or index.key != key:
+            index = SourceIndex.build(projects, key)
+            index.save(path)
+        _index = index
+    return _index
@@ -4,13 +4,12 @@ Tool implementations for Deep Dispatch.
 These are plain Python functions — not LLM tools. The agent pipeline calls them
 directly. Only the source selection and deep research steps involve Gemini.
 
-  load_manifest       — reads sources/manifest.json
-  build_context       — loads source file content into a single string
+  load_manifest       — reads the sources manifest (see manifest.py)
+  build_context       — the source passages most relevant to the question
   to_pdf              — converts markdown report to PDF (fpdf2, pure Python)
   send_to_remarkable  — pushes the PDF to reMarkable via rmapi
 """
 
-import json
 import os
 import re
 import subprocess
@@ -21,36 +20,41 @@ from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 
-SOURCES_DIR = Path(__file__).parent / "sources"
+from manifest import SOURCES_DIR, Manifest, load_manifest  # noqa: F401 — re-exported
+from retrieval import CONTEXT_TOKENS, load_passages, select_passages
+
 REPORTS_DIR = Path(__file__).parent / "reports"
 
 # ── Sources ───────────────────────────────────────────────────────────────────
 
-def load_manifest() -> list[dict]:
-    """Read the NotebookLM sources manifest."""
-    path = SOURCES_DIR / "manifest.json"
-    if not path.exists():
-        return []
-    with open(path) as f:
-        return json.load(f)
-
-
-def build_context(selected_ids: list[str], projects: list[dict]) -> str:
-    """Load source file content for each selected project ID."""
+def build_context(
+    selected_ids: list[str],
+    projects: Manifest,
+    question: str,
+    budget: int = CONTEXT_TOKENS,
+) -> str:
+    """The passages of the selected sources that best match the question, within budget tokens."""
     if not selected_ids:
         return ""
 
-    parts = []
+    passages = []
     for source_id in selected_ids:
-        project = next((p for p in projects if p["id"] == source_id), None)
+        project = projects.get(source_id)
         if not project:
             continue
-        file_path = Path(__file__).parent / project["file"]
-        if not file_path.exists():
-            print(f"  ⚠ Source file not found: {project['file']}")
+        if not project.path.exists():
+            print(f"  ⚠ Source file not found: {project.file}")
             continue
-        content = file_path.read_text(encoding="utf-8")
-        parts.append(f"=== Source: {project['title']} ===\n{content}")
+        passages.extend(load_passages(project.path, project.title))
+
+    # Group the chosen passages back under their source, in document order
+    by_source: dict[str, list[str]] = {}
+    for passage in select_passages(question, passages, budget):
+        by_source.setdefault(passage.source, []).append(passage.text)
+    parts = [
+        f"=== Source: {title} ===\n" + "\n\n[…]\n\n".join(texts)
+        for title, texts in by_source.items()
+    ]
 
     if not parts:
         return ""
@@ -0,0 +1,162 @@
+"""
+Batch mode for Research Scout — many questions, one process.
+
+Reads questions from a file (or stdin), runs a scout session for each on a
+worker pool, and appends one JSON status record per question to a status file.
+All sessions share one Anthropic client, the HTTP pool and the caches, and the
+Anthropic/Tavily rate limits in ratelimit.py apply across the whole batch.
+
+Input is one question per line, or JSONL with {"id": ..., "question": ...}.
+Without an id, a question's id is a hash of its text. A line that can't be
+parsed gets an "error" status record (id "line-N" unless it has one) and the
+rest of the batch runs.
+
+Run it:
+    python batch.py questions.txt --workers 4
+    cat questions.jsonl | python batch.py - --anthropic-rpm 50 --tavily-rpm 100
+
+Re-running with the same --status file resumes: questions already recorded as
+"done" are skipped.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import ratelimit
+from scout import new_client, run
+
+DEFAULT_STATUS = Path(__file__).parent / "reports" / "batch-status.jsonl"
+
+
+def read_questions(source) -> list[dict]:
+    """Parse questions from lines of plain text or JSONL.
+
+    A malformed line becomes a job with an "error" and no question.
+    """
+    jobs = []
+    for number, line in enumerate(source, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                jobs.append(_bad_line(number, line, f"invalid JSON: {e}"))
+                continue
+            question, job_id = item.get("question"), item.get("id")
+            if not isinstance(question, str) or not question.strip():
+                jobs.append(_bad_line(number, line, "expected a non-empty \"question\" string", job_id))
+                continue
+        else:
+            question, job_id = line, None
+        jobs.append({
+            "id": str(job_id) if job_id else hashlib.sha1(question.encode("utf-8")).hexdigest()[:12],
+            "question": question,
+        })
+    return jobs
+
+
+def _bad_line(number: int, line: str, error: str, job_id=None) -> dict:
+    return {
+        "id": str(job_id) if job_id else f"line-{number}",
+        "question": None,
+        "error": f"line {number}: {error}",
+        "line": line[:200],
+    }
+
+
+def completed_ids(status_path: Path) -> set[str]:
+    """IDs already recorded as done in a previous run of this batch."""
+    if not status_path.exists():
+        return set()
+    done = set()
+    for line in status_path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # a line cut short by an interrupted run
+        if record.get("status") == "done":
+            done.add(record["id"])
+    return done
+
+
+class StatusLog:
+    """Thread-safe, append-only JSONL writer."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def run_batch(jobs: list[dict], status_path: Path, workers: int) -> None:
+    done = completed_ids(status_path)
+    pending = [job for job in jobs if job["id"] not in done]
+    print(f"{len(jobs)} question(s), {len(jobs) - len(pending)} already done, {len(pending)} to run")
+
+    client = new_client()
+    log = StatusLog(status_path)
+
+    def work(job: dict) -> None:
+        started = time.time()
+        record = {"id": job["id"], "question": job["question"]}
+        if "error" in job:
+            record.update(status="error", error=job["error"], line=job["line"], elapsed_s=0.0)
+            log.write(record)
+            print(f"[error] {job['id']} ({job['error']})", file=sys.stderr)
+            return
+        try:
+            report = run(job["question"], client=client)
+            record["status"] = "done" if report else "no_report"
+            record["report"] = report
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["elapsed_s"] = round(time.time() - started, 2)
+        log.write(record)
+        print(f"[{record['status']}] {job['id']} ({record['elapsed_s']}s)", file=sys.stderr)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(work, pending))
+    finally:
+        log.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run Research Scout over a file of questions.")
+    parser.add_argument("questions", help="question file (text or JSONL), or - for stdin")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent sessions (default: 4)")
+    parser.add_argument("--status", type=Path, default=DEFAULT_STATUS, help="JSONL status file")
+    parser.add_argument("--anthropic-rpm", type=float, help="Anthropic requests per minute, whole batch")
+    parser.add_argument("--tavily-rpm", type=float, help="Tavily requests per minute, whole batch")
+    args = parser.parse_args()
+
+    ratelimit.configure(anthropic_rpm=args.anthropic_rpm, tavily_rpm=args.tavily_rpm)
+
+    if args.questions == "-":
+        jobs = read_questions(sys.stdin)
+    else:
+        with open(args.questions, encoding="utf-8") as f:
+            jobs = read_questions(f)
+
+    run_batch(jobs, args.status, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark the HTML extraction backends in extract.py.
+
+Runs every installed backend over a directory of saved HTML pages and reports
+throughput, peak memory, and how far each backend's text drifts from the
+reference BeautifulSoup output that fetch_page originally produced.
+
+Run it:
+    python bench/extract_bench.py                  # bench/fixtures/html
+    python bench/extract_bench.py path/to/pages/
+
+Peak memory is measured with tracemalloc, which only sees Python allocations —
+it undercounts the C-level parsers (lxml, selectolax).
+"""
+
+import difflib
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extract import BACKENDS, available, extract_text  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "html"
+
+# Passes over the corpus per backend, for a stable pages/sec figure
+REPEAT = 5
+
+
+def bench(name: str, pages: list[str], reference: list[str]) -> dict:
+    fn = BACKENDS[name]
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for html in pages:
+            fn(html)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    outputs = [fn(html) for html in pages]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    diffs = sum(1 for out, ref in zip(outputs, reference) if out != ref)
+    similarity = sum(
+        difflib.SequenceMatcher(None, out, ref, autojunk=False).ratio()
+        for out, ref in zip(outputs, reference)
+    ) / len(pages)
+
+    return {
+        "backend": name,
+        "pages_per_sec": len(pages) * REPEAT / elapsed,
+        "peak_mb": peak / (1024 * 1024),
+        "diffs": diffs,
+        "similarity": similarity,
+    }
+
+
+def main(fixtures_dir: Path) -> None:
+    paths = sorted(fixtures_dir.glob("*.htm*"))
+    if not paths:
+        print(f"No .html fixtures in {fixtures_dir}")
+        sys.exit(1)
+
+    pages = [p.read_text(encoding="utf-8", errors="replace") for p in paths]
+    reference = [extract_text(html) for html in pages]
+    print(f"\n{len(pages)} page(s) from {fixtures_dir}, {REPEAT} pass(es) per backend\n")
+
+    print(f"{'backend':<12} {'pages/s':>10} {'peak MB':>9} {'diffs':>7} {'similarity':>11}")
+    for name in BACKENDS:
+        if not available(name):
+            print(f"{name:<12} {'not installed':>10}")
+            continue
+        r = bench(name, pages, reference)
+        print(
+            f"{r['backend']:<12} {r['pages_per_sec']:>10.1f} {r['peak_mb']:>9.2f} "
+            f"{r['diffs']:>7} {r['similarity']:>11.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else FIXTURES_DIR)
@@ -0,0 +1,145 @@
+"""
+Offline benchmark suite for Research Scout.
+
+Replays every recorded session in bench/fixtures/sessions (see replay.py) and
+measures, per fixture:
+
+  ms/session     wall-clock time for a full replayed session
+  overhead ms    time not spent inside a model or tool call: the loop itself,
+                 dispatch, compaction, cache-breakpoint copies
+  extract p/s    pages/sec through the configured extraction backend
+  peak MB        Python heap high-water mark for one session (tracemalloc)
+
+Run it:
+    python bench/scout_bench.py
+    python bench/scout_bench.py --save bench/baseline.json
+    python bench/scout_bench.py --check bench/baseline.json   # exit 1 on regression
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extract import BACKEND, BACKENDS  # noqa: E402
+from replay import replay  # noqa: E402
+from telemetry import Telemetry  # noqa: E402
+
+SESSIONS_DIR = Path(__file__).parent / "fixtures" / "sessions"
+
+# Replays per fixture, for stable timings
+REPEAT = 20
+
+# A metric this much worse than the baseline counts as a regression
+TOLERANCE = 0.20
+
+
+def _quiet_replay(path: Path) -> Telemetry:
+    telemetry = Telemetry(path=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        replay(path, concurrent=False, telemetry=telemetry)
+    return telemetry
+
+
+def bench_session(path: Path) -> dict:
+    _quiet_replay(path)  # warm imports and code paths
+
+    wall = 0.0
+    in_calls = 0.0
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        telemetry = _quiet_replay(path)
+        wall += time.perf_counter() - start
+        in_calls += sum(s["duration_ms"] for s in telemetry.spans) / 1000
+
+    tracemalloc.start()
+    _quiet_replay(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    fixture = json.loads(path.read_text(encoding="utf-8"))
+    pages = [
+        base64.b64decode(p["body"]).decode("utf-8", errors="replace")
+        for p in fixture["pages"] if p["status"] == 200
+    ]
+    extract_rate = 0.0
+    if pages:
+        extract = BACKENDS[BACKEND]
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            for html in pages:
+                extract(html)
+        extract_rate = len(pages) * REPEAT / (time.perf_counter() - start)
+
+    return {
+        "ms_per_session": wall / REPEAT * 1000,
+        "overhead_ms": (wall - in_calls) / REPEAT * 1000,
+        "extract_pages_per_sec": extract_rate,
+        "peak_mb": peak / (1024 * 1024),
+    }
+
+
+def regressions(results: dict, baseline: dict) -> list[str]:
+    """Metrics that got worse than the baseline by more than TOLERANCE."""
+    found = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in ("ms_per_session", "overhead_ms", "peak_mb"):
+            if metrics[key] > base[key] * (1 + TOLERANCE):
+                found.append(f"{name}: {key} {base[key]:.2f} → {metrics[key]:.2f}")
+        if metrics["extract_pages_per_sec"] < base["extract_pages_per_sec"] * (1 - TOLERANCE):
+            found.append(
+                f"{name}: extract_pages_per_sec {base['extract_pages_per_sec']:.0f} "
+                f"→ {metrics['extract_pages_per_sec']:.0f}"
+            )
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Research Scout against recorded sessions.")
+    parser.add_argument("sessions", nargs="?", type=Path, default=SESSIONS_DIR)
+    parser.add_argument("--save", type=Path, help="write results as a baseline JSON file")
+    parser.add_argument("--check", type=Path, help="compare against a baseline; exit 1 on regression")
+    args = parser.parse_args()
+
+    paths = sorted(args.sessions.glob("*.json"))
+    if not paths:
+        print(f"No session fixtures in {args.sessions}")
+        sys.exit(1)
+
+    print(f"\n{len(paths)} session(s), {REPEAT} replay(s) each, extraction backend: {BACKEND}\n")
+    print(f"{'session':<28} {'ms/session':>11} {'overhead ms':>12} {'extract p/s':>12} {'peak MB':>8}")
+
+    results = {}
+    for path in paths:
+        r = results[path.stem] = bench_session(path)
+        print(
+            f"{path.stem:<28} {r['ms_per_session']:>11.2f} {r['overhead_ms']:>12.2f} "
+            f"{r['extract_pages_per_sec']:>12.0f} {r['peak_mb']:>8.2f}"
+        )
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.check:
+        found = regressions(results, json.loads(args.check.read_text(encoding="utf-8")))
+        if found:
+            print("\nRegressions:")
+            for line in found:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
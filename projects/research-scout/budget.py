@@ -0,0 +1,94 @@
+"""
+Hard limits for a research session.
+
+Left alone, a model that keeps finding one more thing to search can run for as
+long as it likes. A Budget caps the session on five axes:
+
+  max_turns          model calls before the agent must write its report
+  max_input_tokens   total input tokens (fresh + cache reads + cache writes)
+  max_output_tokens  total output tokens
+  max_tool_calls     calls per tool name; calls over the limit are refused
+  deadline_s         wall-clock seconds since the session started
+
+Limits are checked between turns. When one runs out, scout.py makes one last
+model call that must call write_report. The session always ends with a report,
+not an error.
+
+Defaults come from SCOUT_MAX_* environment variables.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+
+def _env(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+@dataclass
+class Budget:
+    max_turns: int = int(_env("SCOUT_MAX_TURNS", 20))
+    max_input_tokens: int = int(_env("SCOUT_MAX_INPUT_TOKENS", 400_000))
+    max_output_tokens: int = int(_env("SCOUT_MAX_OUTPUT_TOKENS", 40_000))
+    max_tool_calls: dict[str, int] = field(default_factory=lambda: {
+        "search": int(_env("SCOUT_MAX_SEARCHES", 10)),
+        "fetch_page": int(_env("SCOUT_MAX_FETCHES", 15)),
+    })
+    deadline_s: float = _env("SCOUT_DEADLINE_S", 600)
+
+
+class BudgetTracker:
+    """Spending against a Budget for one session. Safe to share across tool threads."""
+
+    def __init__(self, budget: Budget | None = None):
+        self.budget = budget or Budget()
+        self.started = time.monotonic()
+        self.turns = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.tool_calls: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record_usage(self, usage) -> None:
+        """Count one model call and its response.usage."""
+        with self._lock:
+            self.turns += 1
+            self.input_tokens += (
+                usage.input_tokens
+                + (getattr(usage, "cache_read_input_tokens", None) or 0)
+                + (getattr(usage, "cache_creation_input_tokens", None) or 0)
+            )
+            self.output_tokens += usage.output_tokens
+
+    def admit(self, tool_name: str) -> str | None:
+        """Count a tool call. Returns a refusal message if it is over budget."""
+        limit = self.budget.max_tool_calls.get(tool_name)
+        with self._lock:
+            if limit is not None and self.tool_calls[tool_name] >= limit:
+                return (
+                    f"Budget exhausted: {tool_name} has already been called {limit} times "
+                    f"this session. Work with what you have."
+                )
+            self.tool_calls[tool_name] += 1
+            return None
+
+    def exhausted(self) -> str | None:
+        """The first session-wide limit that has run out, or None."""
+        b = self.budget
+        with self._lock:
+            if self.turns >= b.max_turns:
+                return f"{self.turns} turns"
+            if self.input_tokens >= b.max_input_tokens:
+                return f"{self.input_tokens} input tokens"
+            if self.output_tokens >= b.max_output_tokens:
+                return f"{self.output_tokens} output tokens"
+            elapsed = time.monotonic() - self.started
+            if elapsed >= b.deadline_s:
+                return f"{elapsed:.0f}s wall-clock"
+            limited = b.max_tool_calls
+            if limited and all(self.tool_calls[name] >= n for name, n in limited.items()):
+                return "all research tool calls"
+        return None
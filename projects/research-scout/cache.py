@@ -0,0 +1,272 @@
+"""
+Caches for Research Scout.
+
+The same URLs come up again and again across research sessions. PageCache keeps
+the extracted text of every fetched page on disk so a repeat fetch_page call
+skips both the download and the HTML parse.
+
+  - Entries are keyed by a hash of the normalized URL, one JSON file each
+  - Each entry has a TTL; stale entries are revalidated with ETag/Last-Modified
+  - Total size is kept under a byte budget by evicting least recently used entries
+  - Hit/miss counters show how much work the cache saved
+
+SearchCache does the same for Tavily queries: an in-memory LRU for the session,
+optionally backed by SQLite so results survive across sessions.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+CACHE_DIR = Path(os.environ.get("SCOUT_CACHE_DIR", Path(__file__).parent / ".cache"))
+PAGE_CACHE_TTL = float(os.environ.get("SCOUT_PAGE_CACHE_TTL", 24 * 3600))
+PAGE_CACHE_MAX_BYTES = int(float(os.environ.get("SCOUT_PAGE_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+SEARCH_CACHE_TTL = float(os.environ.get("SCOUT_SEARCH_CACHE_TTL", 6 * 3600))
+SEARCH_CACHE_SIZE = int(os.environ.get("SCOUT_SEARCH_CACHE_SIZE", "512"))
+# Set to 0 to keep search results in memory only
+SEARCH_CACHE_PERSIST = os.environ.get("SCOUT_SEARCH_CACHE_PERSIST", "1") != "0"
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL, so trivially different spellings share an entry."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    text: str
+    stored_at: float
+    ttl: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() - self.stored_at < self.ttl
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """Persistent, size-bounded cache of extracted page text."""
+
+    def __init__(self, root: Path, ttl: float = PAGE_CACHE_TTL, max_bytes: int = PAGE_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size: int | None = None  # total bytes on disk, computed lazily
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def get(self, url: str, count: bool = True) -> CacheEntry | None:
+        """Return the entry for url, fresh or stale. Counts a hit only if fresh.
+
+        count=False is a peek: the hit/miss counters and LRU order are left alone.
+        """
+        path = self._path(url)
+        try:
+            entry = CacheEntry(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            if count:
+                with self._lock:
+                    self.misses += 1
+            return None
+
+        if not count:
+            return entry
+        with self._lock:
+            if entry.fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        # mtime doubles as the last-access time for LRU eviction
+        _touch(path)
+        return entry
+
+    def put(self, url: str, text: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        entry = CacheEntry(
+            url=normalize_url(url),
+            text=text,
+            stored_at=time.time(),
+            ttl=self.ttl,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self._write(self._path(url), entry)
+
+    def refresh(self, entry: CacheEntry) -> None:
+        """Mark a stale entry fresh again after a 304 Not Modified."""
+        entry.stored_at = time.time()
+        with self._lock:
+            self.revalidated += 1
+        self._write(self._path(entry.url), entry)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+            }
+
+    def _write(self, path: Path, entry: CacheEntry) -> None:
+        data = json.dumps(entry.__dict__).encode("utf-8")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        old_size = path.stat().st_size if path.exists() else 0
+
+        # Write to a temp file and rename, so readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _disk_usage(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob("*/*.json"))
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under 90% of the budget."""
+        entries = []
+        for p in self.root.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, p in entries:
+            if self._size <= target:
+                break
+            p.unlink(missing_ok=True)
+            self._size -= size
+            self.evictions += 1
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class SearchCache:
+    """Search results keyed on (normalized query, max_results), with TTL expiry."""
+
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        ttl: float = SEARCH_CACHE_TTL,
+        max_entries: int = SEARCH_CACHE_SIZE,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[tuple[str, int], tuple[float, dict]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search ("
+                " query TEXT, max_results INTEGER, stored_at REAL, response TEXT,"
+                " PRIMARY KEY (query, max_results))"
+            )
+            self._db.commit()
+
+    def get(self, query: str, max_results: int) -> dict | None:
+        key = (normalize_query(query), max_results)
+        with self._lock:
+            item = self._memory.get(key)
+            if item is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT stored_at, response FROM search WHERE query = ? AND max_results = ?",
+                    key,
+                ).fetchone()
+                if row:
+                    item = (row[0], json.loads(row[1]))
+
+            if item is None or time.time() - item[0] >= self.ttl:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._remember(key, item)
+            return item[1]
+
+    def put(self, query: str, max_results: int, response: dict) -> None:
+        key = (normalize_query(query), max_results)
+        item = (time.time(), response)
+        with self._lock:
+            self._remember(key, item)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search VALUES (?, ?, ?, ?)",
+                    (*key, item[0], json.dumps(response)),
+                )
+                self._db.commit()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _remember(self, key: tuple[str, int], item: tuple[float, dict]) -> None:
+        self._memory[key] = item
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+def _touch(path: Path) -> None:
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+# Shared by every session in the process
+PAGE_CACHE = PageCache(CACHE_DIR / "pages")
+SEARCH_CACHE = SearchCache(CACHE_DIR / "search.sqlite3" if SEARCH_CACHE_PERSIST else None)
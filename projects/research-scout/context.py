@@ -0,0 +1,108 @@
+"""
+Context compaction for the scout message history.
+
+Every call to the model re-sends the whole conversation, and fetched pages are
+by far the largest part of it. Once the history passes a token budget, compact()
+swaps the oldest tool results for a short stub: a note plus the first few
+hundred characters. The tool_result blocks themselves stay in place, so every
+tool_use still has its matching tool_result.
+
+Compaction goes well below the budget, down to a low-water mark, in one pass.
+Each rewrite changes the history ahead of the prompt-cache breakpoint, so the
+next call pays to write the cache again; freeing room for several turns at once
+keeps the prefix stable, and cache reads working, in between.
+"""
+
+import json
+import os
+
+# Estimated tokens of history to allow before compacting
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("SCOUT_CONTEXT_BUDGET", "60000"))
+# Fraction of the budget that compaction brings the history down to
+LOW_WATER = 0.6
+# Tool-result turns at the end of the history that are never compacted
+KEEP_RECENT_TURNS = 2
+# Characters of the original result kept in a stub
+STUB_CHARS = 400
+
+STUB_MARKER = "[Compacted]"
+
+# Rough but stable: ~4 characters per token for English prose
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(messages: list[dict]) -> int:
+    """Approximate token count of a message history."""
+    return sum(_message_chars(m) for m in messages) // CHARS_PER_TOKEN
+
+
+def compact(
+    messages: list[dict],
+    budget: int = CONTEXT_TOKEN_BUDGET,
+    keep_recent: int = KEEP_RECENT_TURNS,
+    low_water: float = LOW_WATER,
+) -> int:
+    """Once over budget, stub out old tool results, oldest first, until under
+    low_water * budget.
+
+    Mutates messages in place and returns the number of results compacted.
+    """
+    tokens = estimate_tokens(messages)
+    if tokens <= budget:
+        return 0
+    target = int(budget * low_water)
+
+    turns = [m for m in messages if m["role"] == "user" and isinstance(m["content"], list)]
+    candidates = turns[:-keep_recent] if keep_recent else turns
+
+    compacted = 0
+    for message in candidates:
+        for block in message["content"]:
+            content = block.get("content")
+            if block.get("type") != "tool_result" or not isinstance(content, str):
+                continue
+            if len(content) <= 2 * STUB_CHARS or content.startswith(STUB_MARKER):
+                continue
+
+            block["content"] = _stub(content)
+            tokens -= (len(content) - len(block["content"])) // CHARS_PER_TOKEN
+            compacted += 1
+            if tokens <= target:
+                return compacted
+
+    return compacted
+
+
+def _stub(content: str) -> str:
+    return (
+        f"{STUB_MARKER} This result was {len(content)} characters and has been "
+        f"shortened to save context. Call the tool again if you need the full text.\n\n"
+        f"{content[:STUB_CHARS]}…"
+    )
+
+
+def _message_chars(message: dict) -> int:
+    content = message["content"]
+    if isinstance(content, str):
+        return len(content)
+    return sum(_block_chars(block) for block in content)
+
+
+def _block_chars(block) -> int:
+    # History holds both our own dicts and SDK content blocks from responses
+    if isinstance(block, dict):
+        kind = block.get("type")
+        if kind == "tool_result":
+            content = block.get("content", "")
+            return len(content) if isinstance(content, str) else len(json.dumps(content))
+        if kind == "text":
+            return len(block.get("text", ""))
+        if kind == "tool_use":
+            return len(json.dumps(block.get("input", {})))
+        return len(json.dumps(block))
+
+    if block.type == "text":
+        return len(block.text)
+    if block.type == "tool_use":
+        return len(json.dumps(block.input))
+    return 0
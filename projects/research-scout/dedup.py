@@ -0,0 +1,89 @@
+"""
+Near-duplicate page suppression for a research session.
+
+Syndicated articles and mirrored docs mean the agent often fetches pages that
+are almost word for word the same. Each copy costs up to MAX_CHARS of context,
+re-sent on every later turn. PageFingerprints keeps a SimHash of every page
+fetched in the session; a page within a few bits of an earlier one is replaced
+with a one-line stub pointing at the first copy.
+
+SimHash (Charikar): hash every 4-word shingle to 64 bits, and set each bit of
+the fingerprint to the majority vote of that bit across shingles. Pages that
+share most of their shingles end up a small Hamming distance apart, regardless
+of boilerplate differences around the article.
+
+Set SCOUT_DEDUP=0 to turn it off.
+"""
+
+import hashlib
+import os
+import re
+import threading
+
+from cache import normalize_url
+
+DEDUP_ENABLED = os.environ.get("SCOUT_DEDUP", "1") != "0"
+
+SHINGLE_WORDS = 4
+# Fingerprints at most this many bits apart (of 64) count as the same page
+MAX_DISTANCE = 6
+# Shorter pages (error pages, stubs) are too small to fingerprint reliably
+MIN_CHARS = 500
+
+DUPLICATE_MARKER = "[Duplicate]"
+
+_WORD = re.compile(r"\w+")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over the text's word shingles."""
+    words = _WORD.findall(text.lower())
+    shingles = {
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    }
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    half = len(hashes) / 2
+    fingerprint = 0
+    for bit in range(64):
+        mask = 1 << bit
+        if sum(1 for h in hashes if h & mask) > half:
+            fingerprint |= mask
+    return fingerprint
+
+
+class PageFingerprints:
+    """Fingerprints of the pages fetched so far in one session."""
+
+    def __init__(self, enabled: bool = DEDUP_ENABLED, max_distance: int = MAX_DISTANCE):
+        self.enabled = enabled
+        self.max_distance = max_distance
+        self.suppressed = 0
+        self._seen: list[tuple[int, str, str]] = []  # (fingerprint, url, normalized url)
+        self._lock = threading.Lock()
+
+    def check(self, url: str, text: str) -> str:
+        """Return text, or a short stub if it nearly duplicates a different earlier page.
+
+        Re-fetching the same URL returns the text again: the model may be
+        re-reading a page whose earlier result was compacted away.
+        """
+        if not self.enabled or len(text) < MIN_CHARS:
+            return text
+        fingerprint = simhash(text)
+        key = normalize_url(url)
+        with self._lock:
+            if any(key == seen_key for _, _, seen_key in self._seen):
+                return text
+            for seen, first_url, _ in self._seen:
+                if (seen ^ fingerprint).bit_count() <= self.max_distance:
+                    self.suppressed += 1
+                    return (
+                        f"{DUPLICATE_MARKER} The text of {url} is the same as previously "
+                        f"fetched {first_url}, so it is omitted here. Refer to that result."
+                    )
+            self._seen.append((fingerprint, url, key))
+        return text
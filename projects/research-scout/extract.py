@@ -0,0 +1,206 @@
+"""
+HTML → text extraction for fetch_page.
+
+The model only ever sees the first MAX_CHARS characters of a page, so there is
+no point downloading or parsing the rest. TextExtractor is an incremental
+parser: feed it the response as it arrives and stop as soon as it reports done.
+
+Its output matches the original BeautifulSoup path (extract_text below) — text
+nodes stripped and joined with newlines, with script/style/nav/footer dropped.
+
+Full-document parsers can be swapped in with SCOUT_HTML_PARSER:
+
+  stream       — TextExtractor, stops early (default)
+  selectolax   — lexbor backend, needs `pip install selectolax`
+  lxml         — needs `pip install lxml`
+  html.parser  — BeautifulSoup, the original implementation
+
+An unavailable backend falls back to the next one in FALLBACK_ORDER.
+bench/extract_bench.py compares them on saved pages.
+"""
+
+import os
+from collections.abc import Callable
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLTreeBuilder
+
+# Truncate to avoid blowing up the context window
+MAX_CHARS = 8000
+# Stop downloading after this many bytes, even if the text budget isn't met
+MAX_BYTES = int(os.environ.get("SCOUT_FETCH_MAX_BYTES", 2 * 1024 * 1024))
+
+SKIP_TAGS = {"script", "style", "nav", "footer"}
+# Elements that never have content, so never need closing
+VOID_TAGS = HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS
+
+
+class TextExtractor(HTMLParser):
+    """Incremental HTML text extractor with a character budget."""
+
+    def __init__(self, max_chars: int = MAX_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self._parts: list[str] = []
+        self._length = 0       # length of "\n".join(self._parts)
+        self._pending: list[str] = []  # data of the text node being built
+        # Open elements, as BeautifulSoup's tree builder tracks them: an end tag
+        # closes the nearest open element of that name and everything inside it,
+        # so an unclosed <nav> ends when its parent does
+        self._open: list[str] = []
+        self._skip_from: int | None = None   # index in _open of the outermost skipped element
+        self._closed_void: list[str] = []
+
+    @property
+    def done(self) -> bool:
+        return self._length >= self.max_chars
+
+    def text(self) -> str:
+        """Flush buffered input and return the extracted text."""
+        if not self.done:
+            self.close()
+        self._flush()
+        return "\n".join(self._parts)[:self.max_chars]
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in VOID_TAGS:
+            self._closed_void.append(tag)
+            return
+        if tag in SKIP_TAGS and self._skip_from is None:
+            self._skip_from = len(self._open)
+        self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self._closed_void:
+            # </br> after <br>: BeautifulSoup already closed it, and drops this one unseen
+            self._closed_void.remove(tag)
+            return
+        self._flush()
+        if tag not in self._open:
+            return  # stray end tag
+        del self._open[len(self._open) - 1 - self._open[::-1].index(tag):]
+        if self._skip_from is not None and len(self._open) <= self._skip_from:
+            self._skip_from = None
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_data(self, data):
+        if self._skip_from is None and not self.done:
+            self._pending.append(data)
+
+    def _flush(self) -> None:
+        """End the current text node, as BeautifulSoup does at every tag."""
+        if not self._pending:
+            return
+        text = "".join(self._pending).strip()
+        self._pending = []
+        if text and not self.done:
+            self._length += len(text) + (1 if self._parts else 0)
+            self._parts.append(text)
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+# Each takes a complete HTML document and returns the extracted text.
+
+def extract_text(html: str) -> str:
+    """Reference extractor: full-document parse with BeautifulSoup."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(list(SKIP_TAGS)):
+        tag.decompose()
+    text = soup.get_text(separator="\n", strip=True)
+    return text[:MAX_CHARS]
+
+
+def _stream_extract(html: str) -> str:
+    parser = TextExtractor()
+    parser.feed(html)
+    return parser.text()
+
+
+def _selectolax_extract(html: str) -> str:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(SKIP_TAGS))
+    if tree.root is None:
+        return ""
+    parts = []
+    for node in tree.root.traverse(include_text=True):
+        if node.tag == "-text":
+            text = node.text(deep=False).strip()
+            if text:
+                parts.append(text)
+    return "\n".join(parts)[:MAX_CHARS]
+
+
+def _lxml_extract(html: str) -> str:
+    import lxml.html
+    from lxml import etree
+
+    if not html.strip():
+        return ""
+    try:
+        root = lxml.html.document_fromstring(html)
+    except ValueError:
+        # lxml rejects str input that carries an XML encoding declaration
+        root = lxml.html.document_fromstring(html.encode("utf-8"))
+    etree.strip_elements(root, *SKIP_TAGS, with_tail=False)
+
+    parts = [t.strip() for t in _lxml_text_nodes(root) if t.strip()]
+    return "\n".join(parts)[:MAX_CHARS]
+
+
+def _lxml_text_nodes(el):
+    # Comments and processing instructions have a non-string tag; only their
+    # tail is document text
+    if isinstance(el.tag, str) and el.text:
+        yield el.text
+    for child in el:
+        yield from _lxml_text_nodes(child)
+        if child.tail:
+            yield child.tail
+
+
+BACKENDS: dict[str, Callable[[str], str]] = {
+    "stream": _stream_extract,
+    "selectolax": _selectolax_extract,
+    "lxml": _lxml_extract,
+    "html.parser": extract_text,
+}
+
+FALLBACK_ORDER = ["selectolax", "lxml", "stream", "html.parser"]
+
+_REQUIRES = {"selectolax": "selectolax.lexbor", "lxml": "lxml.html"}
+
+
+def available(name: str) -> bool:
+    """True if the backend's optional dependency is installed."""
+    module = _REQUIRES.get(name)
+    if module is None:
+        return name in BACKENDS
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_backend(name: str | None = None) -> str:
+    """Name of the backend to use: the requested one, or the next available."""
+    name = name or os.environ.get("SCOUT_HTML_PARSER", "stream")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {name!r} (choose from {', '.join(BACKENDS)})")
+    if available(name):
+        return name
+    start = FALLBACK_ORDER.index(name)
+    return next(n for n in FALLBACK_ORDER[start:] if available(n))
+
+
+# The backend fetch_page uses, fixed at import time
+BACKEND = resolve_backend()
@@ -0,0 +1,138 @@
+"""
+Speculative page prefetch for Research Scout.
+
+After a search, the model usually reads a few of the pages it just got back,
+but those fetch_page calls only start after another full model round trip.
+With prefetch on, the top-N result URLs of every search start downloading in
+the background as soon as the search returns. When the model then asks for one
+of them, fetch_page is answered from the prefetch (waiting for it if it is
+still in flight) and the page is in the page cache for later sessions too.
+
+Prefetches the model never asks for are wasted bandwidth and fetch budget on
+someone else's server, so each session caps how many unclaimed prefetches it
+may have outstanding. Hit rate and waste are reported at the end of the session.
+
+Set SCOUT_PREFETCH to the number of top results to prefetch per search (0 = off).
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import tools
+from cache import normalize_url
+
+PREFETCH_TOP_N = int(os.environ.get("SCOUT_PREFETCH", "0"))
+# Prefetched pages the model has not (yet) asked for, beyond which prefetching stops
+PREFETCH_MAX_WASTE = int(os.environ.get("SCOUT_PREFETCH_MAX_WASTE", "6"))
+
+
+class Prefetcher:
+    """Prefetch state for one session. start()/take() for run(), astart()/atake() for arun()."""
+
+    def __init__(self, top_n: int = PREFETCH_TOP_N, max_waste: int = PREFETCH_MAX_WASTE):
+        self.top_n = top_n
+        self.max_waste = max_waste
+        self.issued = 0
+        self.hits = 0
+        self.failed = 0
+        self._pending: dict[str, Future | asyncio.Task] = {}
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    # ── Starting prefetches ───────────────────────────────────────────────────
+
+    def start(self, results: str) -> None:
+        """Prefetch the top URLs of a search() result on a background thread pool."""
+        if self.top_n <= 0:
+            return
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.top_n, thread_name_prefix="prefetch")
+            pool = self._pool
+        self._spawn(self._uncached(results), lambda url: pool.submit(tools.fetch_page, url))
+
+    async def astart(self, results: str) -> None:
+        """Async variant of start(). Prefetches run as tasks on the current event loop."""
+        if self.top_n <= 0:
+            return
+        # The cache probe reads from disk, so it runs off the event loop
+        urls = await asyncio.to_thread(self._uncached, results)
+        self._spawn(urls, lambda url: asyncio.create_task(tools.afetch_page(url)))
+
+    def _uncached(self, results: str) -> list[str]:
+        """Top-N URLs of a search() result with no fresh page cache entry."""
+        urls = []
+        for url in tools.result_urls(results)[: self.top_n]:
+            cached = tools.PAGE_CACHE.get(url, count=False)
+            if not (cached and cached.fresh):
+                urls.append(url)
+        return urls
+
+    def _spawn(self, urls: list[str], spawn) -> None:
+        """Spawn prefetches for URLs not already prefetched, within the waste cap."""
+        for url in urls:
+            key = normalize_url(url)
+            with self._lock:
+                if key in self._pending or self._unclaimed() >= self.max_waste:
+                    continue
+                self._pending[key] = spawn(url)
+                self.issued += 1
+
+    def _unclaimed(self) -> int:
+        return self.issued - self.hits - self.failed
+
+    # ── Serving fetch_page ────────────────────────────────────────────────────
+
+    def take(self, url: str) -> str | None:
+        """The prefetched text for url, waiting if needed. None if not prefetched."""
+        handle = self._claim(url)
+        if handle is None:
+            return None
+        return self._settle(handle.result())
+
+    async def atake(self, url: str) -> str | None:
+        """Async variant of take()."""
+        handle = self._claim(url)
+        if handle is None:
+            return None
+        return self._settle(await handle)
+
+    def _claim(self, url: str) -> Future | asyncio.Task | None:
+        with self._lock:
+            return self._pending.pop(normalize_url(url), None)
+
+    def _settle(self, text: str) -> str | None:
+        # fetch_page reports failures as text; let the caller retry those live
+        failed = text.startswith("Error fetching")
+        with self._lock:
+            if failed:
+                self.failed += 1
+            else:
+                self.hits += 1
+        return None if failed else text
+
+    # ── End of session ────────────────────────────────────────────────────────
+
+    def close(self) -> None:
+        """Cancel outstanding prefetches. Threads already downloading finish and fill the cache."""
+        with self._lock:
+            pending = list(self._pending.values())
+            pool, self._pool = self._pool, None
+        for handle in pending:
+            if isinstance(handle, asyncio.Task):
+                handle.cancel()
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            wasted = self._unclaimed()
+            return {
+                "prefetched": self.issued,
+                "hits": self.hits,
+                "failed": self.failed,
+                "wasted": wasted,
+                "hit_rate": round(self.hits / self.issued, 3) if self.issued else 0.0,
+            }
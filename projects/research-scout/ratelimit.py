@@ -0,0 +1,69 @@
+"""
+Process-wide rate limits for the external APIs.
+
+Batch runs drive many sessions at once. Each session is well-behaved on its own,
+but together they can exceed the Anthropic or Tavily request quotas. Every call
+site acquires a slot from the shared limiter for its API first.
+
+Limits are requests per minute. Set them with SCOUT_ANTHROPIC_RPM and
+SCOUT_TAVILY_RPM, or call configure(). Unset means unlimited.
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket: `rate` requests per minute, with bursts up to `burst`."""
+
+    def __init__(self, rate: float | None = None, burst: int | None = None):
+        self._lock = threading.Lock()
+        self.configure(rate, burst)
+
+    def configure(self, rate: float | None, burst: int | None = None) -> None:
+        with self._lock:
+            self.rate = rate
+            self.burst = (burst or max(1, int(rate / 60))) if rate else 0
+            self._tokens = float(self.burst)
+            self._updated = time.monotonic()
+
+    def _reserve(self) -> float:
+        """Take a slot. Returns how long the caller must wait before using it."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            per_second = self.rate / 60
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * per_second)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / per_second)
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def _env_rate(name: str) -> float | None:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+ANTHROPIC_LIMITER = RateLimiter(_env_rate("SCOUT_ANTHROPIC_RPM"))
+TAVILY_LIMITER = RateLimiter(_env_rate("SCOUT_TAVILY_RPM"))
+
+
+def configure(anthropic_rpm: float | None = None, tavily_rpm: float | None = None) -> None:
+    """Override the shared limits, e.g. from batch.py flags."""
+    if anthropic_rpm is not None:
+        ANTHROPIC_LIMITER.configure(anthropic_rpm)
+    if tavily_rpm is not None:
+        TAVILY_LIMITER.configure(tavily_rpm)
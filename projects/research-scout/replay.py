@@ -0,0 +1,232 @@
+"""
+Record and replay Research Scout sessions.
+
+Recording runs a real session and saves everything that crossed the network
+into one JSON fixture: each model response, each Tavily response, and the raw
+HTTP response behind each fetched page. Replaying runs the same run() loop and
+TOOL_DISPATCH against that fixture with no network at all. Page extraction,
+caching and dispatch all execute for real, so replays are a fair basis for
+profiling and for bench/scout_bench.py.
+
+Run it:
+    python replay.py record "What are the failure modes of AI agents?" bench/fixtures/sessions/agents.json
+    python replay.py replay bench/fixtures/sessions/agents.json
+
+Replay covers the non-streaming sync loop (run with stream=False).
+"""
+
+import base64
+import json
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import anthropic
+import httpx
+from anthropic.types import Message
+
+import scout
+import tools
+from cache import PageCache, SearchCache, normalize_query
+from report_index import ReportIndex
+from resilience import CircuitBreaker
+from scout import new_client, run
+
+# Recorded headers that no longer describe the stored (already decoded) body
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+
+class _RecordingMessages:
+    def __init__(self, messages, log: list):
+        self._messages = messages
+        self._log = log
+
+    def create(self, **kwargs) -> Message:
+        response = self._messages.create(**kwargs)
+        self._log.append(response.model_dump(mode="json"))
+        return response
+
+
+class _RecordingAnthropic:
+    def __init__(self, client: anthropic.Anthropic, log: list):
+        self.messages = _RecordingMessages(client.messages, log)
+
+
+class _RecordingTavily:
+    def __init__(self, client, log: list, lock: threading.Lock):
+        self._client = client
+        self._log = log
+        self._lock = lock
+
+    def search(self, query: str, max_results: int = 5) -> dict:
+        response = self._client.search(query, max_results=max_results)
+        with self._lock:
+            self._log.append({"query": query, "max_results": max_results, "response": response})
+        return response
+
+
+class _RecordingTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport, log: list, lock: threading.Lock):
+        self._inner = inner
+        self._log = log
+        self._lock = lock
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._inner.handle_request(request)
+        body = response.read()
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+        with self._lock:
+            self._log.append({
+                "url": str(request.url),
+                "status": response.status_code,
+                "headers": headers,
+                "body": base64.b64encode(body).decode("ascii"),
+            })
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+# ── Replay ────────────────────────────────────────────────────────────────────
+
+class _ReplayMessages:
+    def __init__(self, responses: list[dict]):
+        self._responses = iter(responses)
+
+    def create(self, **kwargs) -> Message:
+        try:
+            return Message.model_validate(next(self._responses))
+        except StopIteration:
+            raise RuntimeError("Replay ran out of recorded model responses") from None
+
+
+class ReplayAnthropic:
+    """Stands in for anthropic.Anthropic, returning recorded responses in order."""
+
+    def __init__(self, responses: list[dict]):
+        self.messages = _ReplayMessages(responses)
+
+
+class _ReplayTavily:
+    def __init__(self, searches: list[dict]):
+        self._searches: dict[tuple[str, int], list[dict]] = {}
+        for item in searches:
+            key = (normalize_query(item["query"]), item["max_results"])
+            self._searches.setdefault(key, []).append(item["response"])
+
+    def search(self, query: str, max_results: int = 5) -> dict:
+        recorded = self._searches.get((normalize_query(query), max_results))
+        if not recorded:
+            raise RuntimeError(f"No recorded search for {query!r}")
+        # Serve repeats in recorded order, then keep serving the last one
+        return recorded.pop(0) if len(recorded) > 1 else recorded[0]
+
+
+def _replay_transport(pages: list[dict]) -> httpx.MockTransport:
+    by_url: dict[str, list[dict]] = {}
+    for page in pages:
+        by_url.setdefault(page["url"], []).append(page)
+    lock = threading.Lock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        with lock:
+            recorded = by_url.get(str(request.url))
+            if not recorded:
+                return httpx.Response(404, text="not recorded", request=request)
+            page = recorded.pop(0) if len(recorded) > 1 else recorded[0]
+        return httpx.Response(
+            page["status"],
+            headers=page["headers"],
+            content=base64.b64decode(page["body"]),
+            request=request,
+        )
+
+    return httpx.MockTransport(handler)
+
+
+# ── Harness ───────────────────────────────────────────────────────────────────
+
+@contextmanager
+def _isolated_tools(http_client: httpx.Client, tavily_client):
+    """Point tools.py at the given clients, with empty caches, a fresh host
+    circuit breaker and a temp reports dir.
+
+    Empty caches make every session hit the (recorded) network the same way,
+    and no breaker state carries over from an earlier replay. scout.py imported
+    the caches by name, so its references are swapped too.
+    """
+    patched = [
+        (tools, name)
+        for name in (
+            "_http_client", "_tavily_client", "PAGE_CACHE", "SEARCH_CACHE",
+            "REPORTS_DIR", "REPORT_INDEX", "HOST_BREAKER",
+        )
+    ] + [(scout, "PAGE_CACHE"), (scout, "SEARCH_CACHE")]
+    saved = [(module, name, getattr(module, name)) for module, name in patched]
+    with tempfile.TemporaryDirectory() as tmp:
+        tools._http_client = http_client
+        tools._tavily_client = tavily_client
+        tools.PAGE_CACHE = scout.PAGE_CACHE = PageCache(Path(tmp) / "pages")
+        tools.SEARCH_CACHE = scout.SEARCH_CACHE = SearchCache()
+        tools.REPORTS_DIR = Path(tmp) / "reports"
+        tools.REPORT_INDEX = ReportIndex(tools.REPORTS_DIR, Path(tmp) / "reports.sqlite3")
+        tools.HOST_BREAKER = CircuitBreaker(tools.HOST_BREAKER.threshold, tools.HOST_BREAKER.cooldown)
+        try:
+            yield
+        finally:
+            http_client.close()
+            tools.REPORT_INDEX.close()
+            for module, name, value in saved:
+                setattr(module, name, value)
+
+
+def record(question: str, path: Path, **run_kwargs) -> str | None:
+    """Run a live session and save its network traffic to a fixture file."""
+    fixture = {"question": question, "model": [], "search": [], "pages": []}
+    lock = threading.Lock()
+
+    transport = _RecordingTransport(httpx.HTTPTransport(http2=True), fixture["pages"], lock)
+    http_client = httpx.Client(transport=transport, **_client_options())
+    tavily = _RecordingTavily(tools._get_tavily_client(), fixture["search"], lock)
+    client = _RecordingAnthropic(new_client(), fixture["model"])
+
+    with _isolated_tools(http_client, tavily):
+        report = run(question, stream=False, client=client, **run_kwargs)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(fixture, indent=1), encoding="utf-8")
+    print(f"\nRecorded {len(fixture['model'])} model call(s), {len(fixture['search'])} search(es), "
+          f"{len(fixture['pages'])} page(s) to {path}")
+    return report
+
+
+def replay(path: Path, **run_kwargs) -> str | None:
+    """Re-run a recorded session offline."""
+    fixture = json.loads(Path(path).read_text(encoding="utf-8"))
+    http_client = httpx.Client(transport=_replay_transport(fixture["pages"]), **_client_options())
+    client = ReplayAnthropic(fixture["model"])
+
+    with _isolated_tools(http_client, _ReplayTavily(fixture["search"])):
+        return run(fixture["question"], stream=False, client=client, **run_kwargs)
+
+
+def _client_options() -> dict:
+    # Transport-level options (http2, limits) belong to the transport we supply
+    options = tools._client_options()
+    return {k: v for k, v in options.items() if k in ("follow_redirects", "timeout")}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "record":
+        record(sys.argv[2], Path(sys.argv[3]))
+    elif len(sys.argv) == 3 and sys.argv[1] == "replay":
+        replay(Path(sys.argv[2]))
+    else:
+        print('Usage: python replay.py record "question" fixture.json')
+        print("       python replay.py replay fixture.json")
+        sys.exit(1)
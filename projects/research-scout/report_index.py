@@ -0,0 +1,107 @@
+"""
+Full-text index over the reports Research Scout has already written.
+
+Every session's report lands in reports/ and, until now, was never read again,
+so the agent re-researched questions it had already answered. ReportIndex keeps
+a SQLite FTS5 index of those reports (BM25 ranking, Porter stemming) that the
+search_past_reports tool queries in milliseconds before going to the web.
+
+The index is incremental: write_report adds each new report as it is written,
+and every query first re-checks the directory's mtimes, so reports edited,
+added or deleted by hand are picked up too. The database is derived data and
+lives in the cache directory; delete it to rebuild from scratch.
+"""
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+from cache import CACHE_DIR
+
+# Characters of each matching report returned alongside the match snippet
+EXCERPT_CHARS = 1500
+
+_HEADING = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+_WORD = re.compile(r"\w+")
+
+
+class ReportIndex:
+    def __init__(self, reports_dir: Path, db_path: Path = CACHE_DIR / "reports.sqlite3"):
+        self.reports_dir = reports_dir
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS reports (name TEXT PRIMARY KEY, mtime REAL, size INTEGER)"
+            )
+            self._db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS report_text USING fts5("
+                " name UNINDEXED, title, body, tokenize = 'porter unicode61')"
+            )
+            self._db.commit()
+
+    def add(self, path: Path, content: str | None = None) -> None:
+        """Index (or re-index) one report file."""
+        if content is None:
+            content = path.read_text(encoding="utf-8", errors="replace")
+        stat = path.stat()
+        match = _HEADING.search(content)
+        title = match.group(1).strip() if match else path.stem
+        with self._lock:
+            self._db.execute("DELETE FROM report_text WHERE name = ?", (path.name,))
+            self._db.execute("INSERT INTO report_text VALUES (?, ?, ?)", (path.name, title, content))
+            self._db.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?)",
+                (path.name, stat.st_mtime, stat.st_size),
+            )
+            self._db.commit()
+
+    def sync(self) -> int:
+        """Bring the index in line with the reports directory. Returns reports (re)indexed."""
+        on_disk = {}
+        if self.reports_dir.exists():
+            for path in self.reports_dir.glob("*.md"):
+                stat = path.stat()
+                on_disk[path.name] = (path, stat.st_mtime, stat.st_size)
+
+        with self._lock:
+            indexed = {
+                name: (mtime, size)
+                for name, mtime, size in self._db.execute("SELECT name, mtime, size FROM reports")
+            }
+            removed = [name for name in indexed if name not in on_disk]
+            for name in removed:
+                self._db.execute("DELETE FROM reports WHERE name = ?", (name,))
+                self._db.execute("DELETE FROM report_text WHERE name = ?", (name,))
+            self._db.commit()
+
+        changed = [path for name, (path, *stat) in on_disk.items() if indexed.get(name) != tuple(stat)]
+        for path in changed:
+            self.add(path)
+        return len(changed)
+
+    def search(self, query: str, limit: int = 5) -> list[dict]:
+        """Reports matching any word of query, best BM25 match first."""
+        words = _WORD.findall(query)
+        if not words:
+            return []
+        self.sync()
+        # Quote every word so FTS5 query syntax in the model's input can't break the MATCH
+        match = " OR ".join(f'"{w}"' for w in words)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name, title, snippet(report_text, 2, '', '', '…', 24), body"
+                " FROM report_text WHERE report_text MATCH ?"
+                " ORDER BY bm25(report_text, 0.0, 5.0, 1.0) LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        return [
+            {"name": name, "title": title, "snippet": " ".join(snippet.split()), "excerpt": body[:EXCERPT_CHARS]}
+            for name, title, snippet, body in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
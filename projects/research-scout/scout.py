@@ -6,23 +6,43 @@ what to do, calls tools, observes results, and decides again — until it's done
 
 Run it:
     python scout.py "What are the most common failure modes in AI agent systems?"
+    python scout.py --stream "..."    # print text as it arrives, start tools early
+
+arun() is the same loop on asyncio, for driving many sessions from one process.
 """
 
+import asyncio
+import json
 import sys
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+
 import anthropic
 from dotenv import load_dotenv
 
-from tools import TOOL_SCHEMAS, TOOL_DISPATCH
+from budget import Budget, BudgetTracker
+from cache import PAGE_CACHE, SEARCH_CACHE
+from context import compact
+from dedup import PageFingerprints
+from prefetch import PREFETCH_TOP_N, Prefetcher
+from ratelimit import ANTHROPIC_LIMITER
+from telemetry import Telemetry
+from tools import ASYNC_TOOL_DISPATCH, TOOL_SCHEMAS, TOOL_DISPATCH
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from resilience import aretry_call, is_transient, log_retry, retry_call  # noqa: E402
 
 load_dotenv()
 
 SYSTEM_PROMPT = """You are a research agent. Given a research question, you work autonomously to find and synthesize information from the web.
 
 Your process:
-1. Plan — decide what search queries will best cover the question from multiple angles
-2. Search — use the search tool to find relevant sources
-3. Read — use fetch_page to read the most useful sources in full when snippets aren't enough
-4. Synthesize — when you have enough, call write_report to produce a structured report
+1. Recall — use search_past_reports to see what earlier sessions already found
+2. Plan — decide what search queries will best cover the question from multiple angles
+3. Search — use the search tool to find relevant sources
+4. Read — use fetch_page to read the most useful sources in full when snippets aren't enough
+5. Synthesize — when you have enough, call write_report to produce a structured report
 
 Rules:
 - Run at least 2 searches before writing the report
@@ -31,9 +51,63 @@ Rules:
 - Call write_report exactly once, at the end
 """
 
+# ── Prompt caching ────────────────────────────────────────────────────────────
+# The system prompt and tool schemas are identical on every call, and each turn
+# only appends to the history. Marking them with cache_control lets the API
+# reuse the processed prefix instead of reading it again as fresh input.
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+CACHED_SYSTEM = [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": CACHE_CONTROL}]
+
+CACHED_TOOLS = TOOL_SCHEMAS[:-1] + [{**TOOL_SCHEMAS[-1], "cache_control": CACHE_CONTROL}]
+
+# Tools that end the session. They run after every other call in the same turn.
+TERMINAL_TOOLS = {"write_report"}
+
+# Upper bound on tool calls executed at once within a single turn.
+MAX_TOOL_WORKERS = 8
+
+
+@dataclass
+class _Session:
+    """Per-session state shared by the loop and the tool calls it dispatches."""
+    telemetry: Telemetry
+    budget: BudgetTracker
+    prefetch: Prefetcher
+    pages: PageFingerprints
+
+
+def new_client(async_: bool = False):
+    """An Anthropic client with SDK retries off — resilience.py handles retries."""
+    if async_:
+        return anthropic.AsyncAnthropic(max_retries=0)
+    return anthropic.Anthropic(max_retries=0)
+
 
-def run(question: str) -> None:
-    client = anthropic.Anthropic()
+def run(
+    question: str,
+    concurrent: bool = True,
+    stream: bool = False,
+    client: anthropic.Anthropic | None = None,
+    telemetry: Telemetry | None = None,
+    budget: Budget | None = None,
+    prefetch: int = PREFETCH_TOP_N,
+) -> str | None:
+    """Research a question. Returns write_report's result, or None if no report.
+
+    Pass a client to share one SDK client (and its connection pool) across sessions.
+    prefetch is how many top results of each search to fetch speculatively (0 = off).
+    """
+    client = client or new_client()
+    session = _Session(
+        telemetry or Telemetry(), BudgetTracker(budget), Prefetcher(prefetch), PageFingerprints()
+    )
+    report = None
+
+    # Streaming starts tools while the model is still generating, so its pool
+    # lives for the whole session rather than a single turn
+    pool = ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS) if stream else None
 
     # The message history. This is the agent's working memory for the session.
     messages = [{"role": "user", "content": question}]
@@ -50,61 +124,529 @@ def run(question: str) -> None:
     #
     # The loop exits when the model stops calling tools (stop_reason == "end_turn")
     # or when the agent calls write_report (our chosen terminal condition).
+    # If the session budget runs out first, one last turn forces write_report.
 
-    while True:
-        response = client.messages.create(
-            model="claude-sonnet-4-6",
-            max_tokens=4096,
-            system=SYSTEM_PROMPT,
-            tools=TOOL_SCHEMAS,
-            messages=messages,
-        )
+    try:
+        while True:
+            # Keep the re-sent history under budget by stubbing out old tool results
+            _compact(messages)
+            forced = _check_budget(session, messages)
+
+            with session.telemetry.span("model", "messages.create") as span:
+                if stream:
+                    try:
+                        response, started = retry_call(
+                            lambda: _stream_response(client, messages, pool, session, forced),
+                            on_retry=log_retry("messages.stream"),
+                        )
+                    except StreamInterrupted as e:
+                        print(f"  ↻ messages.stream: {e} — re-issuing the turn without streaming")
+                        response = retry_call(
+                            lambda: _create(client, messages, forced),
+                            on_retry=log_retry("messages.create"),
+                        )
+                        started = e.reuse(response)
+                else:
+                    response = retry_call(
+                        lambda: _create(client, messages, forced),
+                        on_retry=log_retry("messages.create"),
+                    )
+                    started = {}
+                session.telemetry.record_response(span, response)
+            session.budget.record_usage(response.usage)
+            _print_usage(response.usage)
+
+            # Append the model's response to history so it sees its own reasoning
+            messages.append({"role": "assistant", "content": response.content})
+
+            # Model decided it's done without calling any tools
+            if response.stop_reason == "end_turn":
+                print("\nAgent finished.")
+                break
+
+            # Model wants to call tools
+            if response.stop_reason == "tool_use":
+                tool_blocks = [b for b in response.content if b.type == "tool_use"]
+                results = _dispatch_tools(tool_blocks, concurrent, session, started)
+                tool_results, report = _tool_results(tool_blocks, results)
 
-        # Append the model's response to history so it sees its own reasoning
-        messages.append({"role": "assistant", "content": response.content})
+                # Feed tool results back into the conversation
+                messages.append({"role": "user", "content": tool_results})
 
-        # Model decided it's done without calling any tools
-        if response.stop_reason == "end_turn":
-            print("\nAgent finished.")
-            break
+                if report is not None or forced:
+                    break
 
-        # Model wants to call tools
-        if response.stop_reason == "tool_use":
-            tool_results = []
-            terminal = False
+            else:
+                print(f"Unexpected stop_reason: {response.stop_reason}")
+                break
+    finally:
+        # Also on errors, so a failed session doesn't leave worker threads behind
+        if pool:
+            pool.shutdown()
+        session.prefetch.close()
+    _print_summary(session)
+    return report
 
-            for block in response.content:
-                if block.type != "tool_use":
-                    continue  # skip text blocks in this pass
 
-                # ── Dispatch ──────────────────────────────────────────────────
-                # The model picked a tool by name. We look it up in TOOL_DISPATCH
-                # and call the corresponding Python function with the model's inputs.
+async def arun(
+    question: str,
+    stream: bool = False,
+    client: anthropic.AsyncAnthropic | None = None,
+    telemetry: Telemetry | None = None,
+    budget: Budget | None = None,
+    prefetch: int = PREFETCH_TOP_N,
+) -> str | None:
+    """Async variant of run(). Tool calls within a turn are always concurrent."""
+    client = client or new_client(async_=True)
+    session = _Session(
+        telemetry or Telemetry(), BudgetTracker(budget), Prefetcher(prefetch), PageFingerprints()
+    )
+    report = None
 
-                tool_fn = TOOL_DISPATCH[block.name]
-                print(f"→ {block.name}({_format_args(block.input)})")
+    messages = [{"role": "user", "content": question}]
 
-                result = tool_fn(**block.input)
+    print(f"\nQuestion: {question}\n")
 
-                tool_results.append({
-                    "type": "tool_result",
-                    "tool_use_id": block.id,
-                    "content": result,
-                })
+    try:
+        while True:
+            _compact(messages)
+            forced = _check_budget(session, messages)
 
-                if block.name == "write_report":
-                    print(f"\n{result}")
-                    terminal = True
+            with session.telemetry.span("model", "messages.create") as span:
+                if stream:
+                    try:
+                        response, started = await aretry_call(
+                            lambda: _astream_response(client, messages, session, forced),
+                            on_retry=log_retry("messages.stream"),
+                        )
+                    except StreamInterrupted as e:
+                        print(f"  ↻ messages.stream: {e} — re-issuing the turn without streaming")
+                        response = await aretry_call(
+                            lambda: _acreate(client, messages, forced),
+                            on_retry=log_retry("messages.create"),
+                        )
+                        started = e.reuse(response)
+                else:
+                    response = await aretry_call(
+                        lambda: _acreate(client, messages, forced),
+                        on_retry=log_retry("messages.create"),
+                    )
+                    started = {}
+                session.telemetry.record_response(span, response)
+            session.budget.record_usage(response.usage)
+            _print_usage(response.usage)
 
-            # Feed tool results back into the conversation
-            messages.append({"role": "user", "content": tool_results})
+            messages.append({"role": "assistant", "content": response.content})
 
-            if terminal:
+            if response.stop_reason == "end_turn":
+                print("\nAgent finished.")
                 break
 
-        else:
-            print(f"Unexpected stop_reason: {response.stop_reason}")
-            break
+            if response.stop_reason == "tool_use":
+                tool_blocks = [b for b in response.content if b.type == "tool_use"]
+                results = await _adispatch_tools(tool_blocks, session, started)
+                tool_results, report = _tool_results(tool_blocks, results)
+
+                messages.append({"role": "user", "content": tool_results})
+
+                if report is not None or forced:
+                    break
+
+            else:
+                print(f"Unexpected stop_reason: {response.stop_reason}")
+                break
+    finally:
+        session.prefetch.close()
+    _print_summary(session)
+    return report
+
+
+def _request_args(messages: list[dict], force_report: bool = False) -> dict:
+    args = {
+        "model": "claude-sonnet-4-6",
+        "max_tokens": 4096,
+        "system": CACHED_SYSTEM,
+        "tools": CACHED_TOOLS,
+        "messages": _with_cache_breakpoint(messages),
+    }
+    if force_report:
+        args["tool_choice"] = {"type": "tool", "name": "write_report"}
+    return args
+
+
+def _check_budget(session: _Session, messages: list[dict]) -> bool:
+    """If the budget has run out, ask for the report now. Returns True if so."""
+    reason = session.budget.exhausted()
+    if reason is None:
+        return False
+
+    print(f"\n  Budget reached ({reason}) — forcing the report.")
+    note = {
+        "type": "text",
+        "text": (
+            f"The research budget for this session is used up ({reason}). "
+            "Call write_report now with the best report you can make from what you have."
+        ),
+    }
+    last = messages[-1]
+    if isinstance(last["content"], str):
+        last["content"] = [{"type": "text", "text": last["content"]}]
+    last["content"].append(note)
+    return True
+
+
+# Each model call, retries included, takes a slot from the shared rate limit
+
+def _create(client: anthropic.Anthropic, messages: list[dict], force_report: bool = False):
+    ANTHROPIC_LIMITER.acquire()
+    return client.messages.create(**_request_args(messages, force_report))
+
+
+async def _acreate(client: anthropic.AsyncAnthropic, messages: list[dict], force_report: bool = False):
+    await ANTHROPIC_LIMITER.aacquire()
+    return await client.messages.create(**_request_args(messages, force_report))
+
+
+class StreamInterrupted(Exception):
+    """A streamed response failed transiently after text was printed or tools were started.
+
+    Streaming the turn again would print the text twice and run those tools
+    twice, so retry_call() doesn't retry this. Instead the caller re-issues the
+    turn without streaming, and reuse() hands the new response the results of
+    tools that already ran, matched by tool name and input.
+    """
+
+    def __init__(self, message: str, finished: dict):
+        super().__init__(message)
+        self.finished = finished   # _tool_key(block) → completed Future or Task
+
+    def reuse(self, response) -> dict:
+        """{tool_use_id: completed Future or Task} for the response's repeated tool calls."""
+        finished = dict(self.finished)
+        reused = {}
+        for block in response.content:
+            if block.type == "tool_use" and _tool_key(block) in finished:
+                reused[block.id] = finished.pop(_tool_key(block))
+        return reused
+
+
+def _tool_key(block) -> tuple[str, str]:
+    return block.name, json.dumps(block.input, sort_keys=True)
+
+
+def _stream_response(
+    client: anthropic.Anthropic,
+    messages: list[dict],
+    pool: ThreadPoolExecutor,
+    session: _Session,
+    force_report: bool = False,
+):
+    """Stream one model response, starting tools as soon as their input is complete.
+
+    Text is printed as it arrives. A tool_use block is final once its
+    content_block_stop event arrives, so non-terminal tools start running then,
+    overlapping their I/O with the rest of the generation.
+
+    Returns (final message, {tool_use_id: Future} for the tools already started).
+    """
+    ANTHROPIC_LIMITER.acquire()
+    started, blocks = {}, {}
+    printer = _StreamPrinter()
+    try:
+        with client.messages.stream(**_request_args(messages, force_report)) as stream:
+            for event in stream:
+                if event.type == "text":
+                    printer.text(event.text)
+                elif event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                    block = event.content_block
+                    if block.name not in TERMINAL_TOOLS:
+                        printer.line(f"→ {block.name}({_format_args(block.input)})")
+                        started[block.id] = pool.submit(_call_tool, block, session)
+                        blocks[block.id] = block
+            response = stream.get_final_message()
+    except Exception as e:
+        if not (printer.printed or started):
+            raise
+        # Let the started tools finish, so their results can be reused
+        wait(started.values())
+        printer.line("")
+        if not is_transient(e):
+            raise
+        finished = {_tool_key(blocks[i]): f for i, f in started.items()}
+        raise StreamInterrupted(f"response stream failed mid-way ({type(e).__name__})", finished) from e
+    printer.line("")
+    return response, started
+
+
+async def _astream_response(
+    client: anthropic.AsyncAnthropic,
+    messages: list[dict],
+    session: _Session,
+    force_report: bool = False,
+):
+    """Async variant of _stream_response(). Started tools are asyncio tasks."""
+    await ANTHROPIC_LIMITER.aacquire()
+    started, blocks = {}, {}
+    printer = _StreamPrinter()
+    try:
+        async with client.messages.stream(**_request_args(messages, force_report)) as stream:
+            async for event in stream:
+                if event.type == "text":
+                    printer.text(event.text)
+                elif event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                    block = event.content_block
+                    if block.name not in TERMINAL_TOOLS:
+                        printer.line(f"→ {block.name}({_format_args(block.input)})")
+                        started[block.id] = asyncio.create_task(_acall_tool(block, session))
+                        blocks[block.id] = block
+            response = await stream.get_final_message()
+    except Exception as e:
+        if not (printer.printed or started):
+            raise
+        await asyncio.gather(*started.values(), return_exceptions=True)
+        printer.line("")
+        if not is_transient(e):
+            raise
+        finished = {_tool_key(blocks[i]): t for i, t in started.items()}
+        raise StreamInterrupted(f"response stream failed mid-way ({type(e).__name__})", finished) from e
+    printer.line("")
+    return response, started
+
+
+class _StreamPrinter:
+    """Prints streamed text inline and tool lines on their own line."""
+
+    def __init__(self):
+        self.mid_line = False
+        self.printed = False
+
+    def text(self, chunk: str) -> None:
+        print(chunk, end="", flush=True)
+        self.printed = self.printed or bool(chunk)
+        self.mid_line = not chunk.endswith("\n")
+
+    def line(self, line: str) -> None:
+        if self.mid_line:
+            print()
+            self.mid_line = False
+        if line:
+            print(line)
+
+
+def _call_tool(block, session: _Session) -> str:
+    refusal = session.budget.admit(block.name)
+    if refusal:
+        return refusal
+    with session.telemetry.span("tool", block.name, tool_use_id=block.id) as span:
+        result = None
+        if block.name == "fetch_page":
+            result = session.prefetch.take(block.input.get("url", ""))
+            if result is not None:
+                span["prefetched"] = True
+        if result is None:
+            result = TOOL_DISPATCH[block.name](**block.input)
+        if block.name == "fetch_page":
+            result = _dedup_page(block, result, session, span)
+        if block.name == "search":
+            session.prefetch.start(result)
+        span["bytes"] = len(result.encode("utf-8"))
+    return result
+
+
+async def _acall_tool(block, session: _Session) -> str:
+    refusal = session.budget.admit(block.name)
+    if refusal:
+        return refusal
+    with session.telemetry.span("tool", block.name, tool_use_id=block.id) as span:
+        result = None
+        if block.name == "fetch_page":
+            result = await session.prefetch.atake(block.input.get("url", ""))
+            if result is not None:
+                span["prefetched"] = True
+        if result is None:
+            result = await ASYNC_TOOL_DISPATCH[block.name](**block.input)
+        if block.name == "fetch_page":
+            # SimHash costs milliseconds per page; keep it off the event loop
+            result = await asyncio.to_thread(_dedup_page, block, result, session, span)
+        if block.name == "search":
+            await session.prefetch.astart(result)
+        span["bytes"] = len(result.encode("utf-8"))
+    return result
+
+
+def _dedup_page(block, text: str, session: _Session, span: dict) -> str:
+    """Swap a near-duplicate of an earlier page this session for a short stub."""
+    checked = session.pages.check(block.input.get("url", ""), text)
+    if checked is not text:
+        span["duplicate"] = True
+    return checked
+
+
+def _dispatch_tools(
+    blocks: list,
+    concurrent: bool,
+    session: _Session,
+    started: dict | None = None,
+) -> list[str]:
+    """Execute a turn's tool calls and return their results in block order.
+
+    The model picked each tool by name. We look it up in TOOL_DISPATCH and call
+    the corresponding Python function with the model's inputs. Calls within one
+    turn are independent, so in concurrent mode they share a bounded thread pool
+    and the turn costs the slowest call rather than the sum of all of them.
+    Terminal tools wait until everything else in the turn has finished.
+
+    started maps tool_use ids to Futures for calls already running (streaming).
+    """
+    started = started or {}
+    for block in blocks:
+        if block.id not in started:
+            print(f"→ {block.name}({_format_args(block.input)})")
+
+    results: list[str] = [""] * len(blocks)
+    pending = [
+        i for i, b in enumerate(blocks)
+        if b.name not in TERMINAL_TOOLS and b.id not in started
+    ]
+    terminal = [i for i, b in enumerate(blocks) if b.name in TERMINAL_TOOLS]
+
+    if concurrent and len(pending) > 1:
+        workers = min(MAX_TOOL_WORKERS, len(pending))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {i: pool.submit(_call_tool, blocks[i], session) for i in pending}
+            for i, future in futures.items():
+                results[i] = future.result()
+    else:
+        for i in pending:
+            results[i] = _call_tool(blocks[i], session)
+
+    for i, block in enumerate(blocks):
+        if block.id in started:
+            results[i] = started[block.id].result()
+
+    for i in terminal:
+        results[i] = _call_tool(blocks[i], session)
+
+    return results
+
+
+async def _adispatch_tools(
+    blocks: list,
+    session: _Session,
+    started: dict | None = None,
+) -> list[str]:
+    """Async variant of _dispatch_tools()."""
+    started = started or {}
+    for block in blocks:
+        if block.id not in started:
+            print(f"→ {block.name}({_format_args(block.input)})")
+
+    results: list[str] = [""] * len(blocks)
+    pending = [
+        i for i, b in enumerate(blocks)
+        if b.name not in TERMINAL_TOOLS and b.id not in started
+    ]
+    terminal = [i for i, b in enumerate(blocks) if b.name in TERMINAL_TOOLS]
+
+    gathered = await asyncio.gather(*(_acall_tool(blocks[i], session) for i in pending))
+    for i, result in zip(pending, gathered):
+        results[i] = result
+
+    for i, block in enumerate(blocks):
+        if block.id in started:
+            results[i] = await started[block.id]
+
+    for i in terminal:
+        results[i] = await _acall_tool(blocks[i], session)
+
+    return results
+
+
+def _tool_results(blocks: list, results: list[str]) -> tuple[list[dict], str | None]:
+    """Build the tool_result message content.
+
+    Returns (content, terminal result) — the second is None unless a terminal
+    tool ran this turn.
+    """
+    tool_results = []
+    terminal = None
+
+    for block, result in zip(blocks, results):
+        tool_results.append({
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "content": result,
+        })
+
+        if block.name in TERMINAL_TOOLS:
+            print(f"\n{result}")
+            terminal = result
+
+    return tool_results, terminal
+
+
+def _with_cache_breakpoint(messages: list[dict]) -> list[dict]:
+    """Copy of messages with a cache breakpoint on the last block.
+
+    The stored history is left untouched so breakpoints from earlier turns
+    don't pile up (the API allows at most four per request).
+    """
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = list(content)
+    blocks[-1] = {**blocks[-1], "cache_control": CACHE_CONTROL}
+    return messages[:-1] + [{**last, "content": blocks}]
+
+
+def _print_usage(usage) -> None:
+    print(
+        f"  [tokens] in={usage.input_tokens} out={usage.output_tokens} "
+        f"cache_read={usage.cache_read_input_tokens or 0} "
+        f"cache_write={usage.cache_creation_input_tokens or 0}"
+    )
+
+
+def _compact(messages: list[dict]) -> None:
+    compacted = compact(messages)
+    if compacted:
+        print(f"  (compacted {compacted} old tool result(s) to stay under the context budget)")
+
+
+def _print_summary(session: _Session) -> None:
+    telemetry = session.telemetry
+    summary = telemetry.summary()
+    if summary:
+        print(f"\nSession {telemetry.trace_id}:\n{summary}")
+    _print_cache_stats()
+    _print_prefetch_stats(session)
+    if session.pages.suppressed:
+        print(f"Near-duplicate pages suppressed: {session.pages.suppressed}")
+
+
+def _print_cache_stats() -> None:
+    stats = PAGE_CACHE.stats()
+    if stats["hits"] or stats["misses"]:
+        print(
+            f"Page cache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+            f"{stats['revalidated']} revalidated"
+        )
+    stats = SEARCH_CACHE.stats()
+    if stats["hits"] or stats["misses"]:
+        print(f"Search cache: {stats['hits']} hit(s), {stats['misses']} miss(es)")
+
+
+def _print_prefetch_stats(session: _Session) -> None:
+    stats = session.prefetch.stats()
+    if not stats["prefetched"]:
+        return
+    session.telemetry.emit({"trace_id": session.telemetry.trace_id, "kind": "prefetch", **stats})
+    print(
+        f"Prefetch: {stats['hits']}/{stats['prefetched']} used ({stats['hit_rate']:.0%}), "
+        f"{stats['wasted']} wasted, {stats['failed']} failed"
+    )
 
 
 def _format_args(inputs: dict) -> str:
@@ -119,8 +661,9 @@ def _format_args(inputs: dict) -> str:
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print('Usage: python scout.py "your research question"')
+    args = [a for a in sys.argv[1:] if a != "--stream"]
+    if not args:
+        print('Usage: python scout.py [--stream] "your research question"')
         sys.exit(1)
 
-    run(" ".join(sys.argv[1:]))
+    run(" ".join(args), stream="--stream" in sys.argv[1:])
@@ -0,0 +1,320 @@
+"""
+Research Scout as a long-running local HTTP service.
+
+One warm process accepts research jobs over HTTP, queues them, and runs up to
+--workers sessions at once on a single event loop (scout.arun). Every session
+shares the pooled Anthropic and HTTP clients, the page and search caches and
+the rate limits, so a question costs no interpreter or client startup.
+
+Endpoints:
+    POST /jobs                 {"question": "..."}  → 202 {"id": ..., "status": "queued"}
+    GET  /jobs                 all jobs, newest first
+    GET  /jobs/{id}            one job: status, result or error
+    GET  /jobs/{id}/events     progress as Server-Sent Events (telemetry spans
+                               and status changes), ending when the job does
+    GET  /reports              report filenames
+    GET  /reports/{name}       one report as markdown
+
+Run it:
+    python service.py --port 8765 --workers 4
+    curl -X POST localhost:8765/jobs -d '{"question": "What is RAG?"}'
+    curl -N localhost:8765/jobs/<id>/events
+
+Finished jobs are kept, events and all, for --job-ttl seconds and at most
+--keep-jobs of them; older ones are dropped and their ids return 404.
+
+The server speaks just enough HTTP/1.1 for curl and browsers, one request per
+connection. It binds to localhost by default and has no authentication.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass, field, fields
+from urllib.parse import unquote
+
+import ratelimit
+import tools
+from scout import arun, new_client
+from telemetry import Telemetry
+
+MAX_BODY_BYTES = 64 * 1024
+
+# Retention of finished jobs
+KEEP_JOBS = 200
+JOB_TTL = 3600.0
+
+STATUS_TEXT = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+}
+
+
+@dataclass
+class Job:
+    id: str
+    question: str
+    status: str = "queued"      # queued → running → done | no_report | error
+    created: float = field(default_factory=time.time)
+    finished: float | None = None
+    result: str | None = None
+    error: str | None = None
+    events: list[dict] = field(default_factory=list, repr=False)
+    # Set, then replaced, whenever an event is added
+    changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def public(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name not in ("events", "changed")}
+
+    @property
+    def over(self) -> bool:
+        return self.status not in ("queued", "running")
+
+
+class ResearchService:
+    """Job queue, worker tasks and the event fan-out for SSE subscribers."""
+
+    def __init__(self, workers: int = 4, keep_jobs: int = KEEP_JOBS, job_ttl: float = JOB_TTL):
+        self.workers = workers
+        self.keep_jobs = keep_jobs
+        self.job_ttl = job_ttl
+        self.jobs: dict[str, Job] = {}
+        self._queue: asyncio.Queue[Job] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._client = None
+
+    async def start(self) -> None:
+        self._client = new_client(async_=True)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, question: str) -> Job:
+        job = Job(id=uuid.uuid4().hex[:12], question=question)
+        self._prune()
+        self.jobs[job.id] = job
+        self._queue.put_nowait(job)
+        self._publish(job, {"kind": "status", "status": job.status})
+        return job
+
+    async def events(self, job: Job):
+        """Yield a job's events from the start, then live ones until the job ends."""
+        sent = 0
+        while True:
+            # Taken before reading events, so nothing published after the read is missed
+            changed = job.changed
+            batch = job.events[sent:]
+            for event in batch:
+                yield event
+            sent += len(batch)
+            if job.over and sent == len(job.events):
+                return
+            if not batch:
+                await changed.wait()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        loop = asyncio.get_running_loop()
+
+        def on_event(event: dict) -> None:
+            # Spans may be emitted from worker threads (asyncio.to_thread)
+            loop.call_soon_threadsafe(self._publish, job, event)
+
+        job.status = "running"
+        self._publish(job, {"kind": "status", "status": job.status})
+        try:
+            job.result = await arun(
+                job.question,
+                client=self._client,
+                telemetry=Telemetry(trace_id=job.id, on_event=on_event),
+            )
+            job.status = "done" if job.result else "no_report"
+        except Exception as e:
+            job.status = "error"
+            job.error = f"{type(e).__name__}: {e}"
+        job.finished = time.time()
+        # Let any span events queued by on_event land before the final status
+        await asyncio.sleep(0)
+        self._publish(job, {"kind": "status", "status": job.status})
+
+    def _publish(self, job: Job, event: dict) -> None:
+        job.events.append(event)
+        job.changed.set()
+        job.changed = asyncio.Event()
+
+    def _prune(self) -> None:
+        """Drop finished jobs older than job_ttl, then all but the newest keep_jobs."""
+        finished = sorted((j for j in self.jobs.values() if j.over), key=lambda j: j.finished)
+        cutoff = time.time() - self.job_ttl
+        excess = len(finished) - self.keep_jobs
+        for i, job in enumerate(finished):
+            if i < excess or job.finished < cutoff:
+                del self.jobs[job.id]
+
+
+# ── HTTP ──────────────────────────────────────────────────────────────────────
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, bytes]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    try:
+        method, target, _ = request_line.split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "bad Content-Length") from None
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), unquote(target.split("?", 1)[0]), body
+
+
+def _response(status: int, body: bytes, content_type: str) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+def _json(status: int, payload) -> bytes:
+    return _response(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+
+def _report_path(name: str):
+    path = (tools.REPORTS_DIR / name).resolve()
+    if path.parent != tools.REPORTS_DIR.resolve() or path.suffix != ".md" or not path.is_file():
+        raise HTTPError(404, f"no report named {name!r}")
+    return path
+
+
+async def _route(service: ResearchService, method: str, path: str, body: bytes, writer) -> bytes | None:
+    """Handle one request. Returns the response, or None if it was streamed already."""
+    parts = [p for p in path.split("/") if p]
+
+    if parts == ["jobs"]:
+        if method == "GET":
+            jobs = sorted(service.jobs.values(), key=lambda j: j.created, reverse=True)
+            return _json(200, [job.public() for job in jobs])
+        if method == "POST":
+            try:
+                question = json.loads(body)["question"].strip()
+            except (ValueError, KeyError, TypeError, AttributeError):
+                raise HTTPError(400, 'expected a JSON body like {"question": "..."}') from None
+            if not question:
+                raise HTTPError(400, "question is empty")
+            job = service.submit(question)
+            return _json(202, {"id": job.id, "status": job.status})
+        raise HTTPError(405, f"{method} not allowed on /jobs")
+
+    if method != "GET":
+        raise HTTPError(405, f"{method} not allowed on {path}")
+
+    if parts[:1] == ["jobs"] and len(parts) in (2, 3):
+        job = service.jobs.get(parts[1])
+        if job is None:
+            raise HTTPError(404, f"no job {parts[1]!r}")
+        if len(parts) == 2:
+            return _json(200, job.public())
+        if parts[2] == "events":
+            await _stream_events(service, job, writer)
+            return None
+
+    if parts == ["reports"]:
+        names = sorted(p.name for p in tools.REPORTS_DIR.glob("*.md")) if tools.REPORTS_DIR.exists() else []
+        return _json(200, names)
+
+    if parts[:1] == ["reports"] and len(parts) == 2:
+        text = _report_path(parts[1]).read_bytes()
+        return _response(200, text, "text/markdown; charset=utf-8")
+
+    raise HTTPError(404, f"nothing at {path}")
+
+
+async def _stream_events(service: ResearchService, job: Job, writer: asyncio.StreamWriter) -> None:
+    writer.write(
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: text/event-stream\r\n"
+        b"Cache-Control: no-cache\r\n"
+        b"Connection: close\r\n\r\n"
+    )
+    async for event in service.events(job):
+        writer.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        await writer.drain()
+    writer.write(b"event: end\ndata: {}\n\n")
+
+
+async def _handle(service: ResearchService, reader, writer) -> None:
+    try:
+        try:
+            method, path, body = await _read_request(reader)
+            response = await _route(service, method, path, body, writer)
+        except HTTPError as e:
+            response = _json(e.status, {"error": str(e)})
+        if response:
+            writer.write(response)
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass  # client went away
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int, workers: int, keep_jobs: int = KEEP_JOBS, job_ttl: float = JOB_TTL) -> None:
+    service = ResearchService(workers, keep_jobs, job_ttl)
+    await service.start()
+    server = await asyncio.start_server(lambda r, w: _handle(service, r, w), host, port)
+    print(f"Research Scout service on http://{host}:{port} ({workers} worker(s))")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve Research Scout over a local HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4, help="concurrent sessions (default: 4)")
+    parser.add_argument("--keep-jobs", type=int, default=KEEP_JOBS, help=f"finished jobs to keep (default: {KEEP_JOBS})")
+    parser.add_argument("--job-ttl", type=float, default=JOB_TTL, help=f"seconds to keep a finished job (default: {JOB_TTL:g})")
+    parser.add_argument("--anthropic-rpm", type=float, help="Anthropic requests per minute, all jobs")
+    parser.add_argument("--tavily-rpm", type=float, help="Tavily requests per minute, all jobs")
+    args = parser.parse_args()
+
+    ratelimit.configure(anthropic_rpm=args.anthropic_rpm, tavily_rpm=args.tavily_rpm)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.keep_jobs, args.job_ttl))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Per-session timing for the agentic loop.
+
+Every model call and tool call becomes a span: wall-clock duration, bytes
+returned, and token usage for model calls. Spans are emitted as structured JSON
+events (OpenTelemetry-style: trace_id = session, one span_id per call) and
+summarized at the end of the session as a p50/p95 table per tool.
+
+Set SCOUT_TELEMETRY_FILE to append every event to a JSONL file.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from contextlib import contextmanager
+from pathlib import Path
+
+TELEMETRY_FILE = os.environ.get("SCOUT_TELEMETRY_FILE")
+
+TOKEN_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+
+
+class Telemetry:
+    """Collects spans for one research session."""
+
+    def __init__(
+        self,
+        trace_id: str | None = None,
+        path: str | Path | None = TELEMETRY_FILE,
+        on_event: Callable[[dict], None] | None = None,
+    ):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.path = Path(path) if path else None
+        self.on_event = on_event
+        self.spans: list[dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, kind: str, name: str, **attrs):
+        """Time a block. The yielded dict collects extra attributes (bytes, tokens)."""
+        span = {
+            "trace_id": self.trace_id,
+            "span_id": uuid.uuid4().hex[:16],
+            "kind": kind,
+            "name": name,
+            "start": time.time(),
+            **attrs,
+        }
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            self.emit(span)
+
+    def record_usage(self, span: dict, usage) -> None:
+        """Copy token counts from a response.usage object onto a span."""
+        for field in TOKEN_FIELDS:
+            span[field] = getattr(usage, field, None) or 0
+
+    def record_response(self, span: dict, response) -> None:
+        """Record a model response's token usage and its size as JSON."""
+        self.record_usage(span, response.usage)
+        span["bytes"] = len(response.model_dump_json().encode("utf-8"))
+
+    def emit(self, event: dict) -> None:
+        with self._lock:
+            if "span_id" in event:
+                self.spans.append(event)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(event) + "\n")
+        if self.on_event:
+            self.on_event(event)
+
+    def summary(self) -> str:
+        """Table of call counts, latency percentiles, bytes and tokens by name."""
+        with self._lock:
+            spans = list(self.spans)
+        if not spans:
+            return ""
+
+        by_name: dict[str, list[dict]] = {}
+        for span in spans:
+            by_name.setdefault(span["name"], []).append(span)
+
+        lines = [
+            f"  {'call':<16} {'n':>4} {'total s':>8} {'p50 ms':>8} {'p95 ms':>8} {'bytes':>9}",
+        ]
+        for name, group in by_name.items():
+            durations = sorted(s["duration_ms"] for s in group)
+            lines.append(
+                f"  {name:<16} {len(group):>4} {sum(durations) / 1000:>8.2f} "
+                f"{percentile(durations, 50):>8.0f} {percentile(durations, 95):>8.0f} "
+                f"{sum(s.get('bytes', 0) for s in group):>9}"
+            )
+
+        totals = {f: sum(s.get(f, 0) for s in spans) for f in TOKEN_FIELDS}
+        lines.append(
+            f"  tokens: in={totals['input_tokens']} out={totals['output_tokens']} "
+            f"cache_read={totals['cache_read_input_tokens']} "
+            f"cache_write={totals['cache_creation_input_tokens']}"
+        )
+        return "\n".join(lines)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil without math
+    return sorted_values[int(rank) - 1]
@@ -8,21 +8,155 @@ Each tool has two parts:
 The model decides when and how to call tools. This file defines the menu.
 """
 
+import asyncio
+import atexit
+import hashlib
 import os
+import re
+import sys
+import tempfile
+import threading
+import weakref
 from pathlib import Path
 
 import httpx
-from bs4 import BeautifulSoup
-from tavily import TavilyClient
+from tavily import AsyncTavilyClient, TavilyClient
+
+from cache import PAGE_CACHE, SEARCH_CACHE
+from extract import BACKEND, BACKENDS, MAX_BYTES, TextExtractor
+from ratelimit import TAVILY_LIMITER
+from report_index import ReportIndex
+
+# resilience.py is shared with deep-dispatch and lives in the repo's shared/ directory
+sys.path.append(str(Path(__file__).resolve().parents[2] / "shared"))
+from resilience import CircuitBreaker, aretry_call, log_retry, retry_call  # noqa: E402
+
+
+REPORTS_DIR = Path(__file__).parent / "reports"
+REPORT_INDEX = ReportIndex(REPORTS_DIR)
+
+# Hosts that keep failing are skipped for a while instead of eating fetch attempts
+HOST_BREAKER = CircuitBreaker(threshold=3, cooldown=120)
+
+
+# ── HTTP client ───────────────────────────────────────────────────────────────
+# One pooled client per process (and one per event loop for the async tools).
+# Repeat fetches from the same host reuse a warm keep-alive or HTTP/2
+# connection instead of paying for a new TCP and TLS handshake every time.
+
+FETCH_TIMEOUT = float(os.environ.get("SCOUT_FETCH_TIMEOUT", "15"))
+CONNECT_TIMEOUT = float(os.environ.get("SCOUT_CONNECT_TIMEOUT", "5"))
+MAX_CONNECTIONS = int(os.environ.get("SCOUT_MAX_CONNECTIONS", "50"))
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("SCOUT_MAX_CONNECTIONS_PER_HOST", "4"))
+
+_http_lock = threading.Lock()
+_http_client: httpx.Client | None = None
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+
+# httpx.AsyncClient is bound to the event loop it first ran on, and so is the
+# AsyncTavilyClient, which holds one internally
+_async_http: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+
+def _client_options() -> dict:
+    return {
+        "http2": True,
+        "follow_redirects": True,
+        "timeout": httpx.Timeout(FETCH_TIMEOUT, connect=CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_CONNECTIONS,
+        ),
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled HTTP client, creating it on first use."""
+    global _http_client
+    with _http_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(**_client_options())
+            atexit.register(_http_client.close)
+        return _http_client
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    """Semaphore capping concurrent requests to the URL's host."""
+    host = httpx.URL(url).host
+    with _http_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+        return _host_slots[host]
+
+
+class _LoopState:
+    """Async clients and host semaphores belonging to one event loop."""
+
+    def __init__(self):
+        self.http = httpx.AsyncClient(**_client_options())
+        self.host_slots: dict[str, asyncio.Semaphore] = {}
+        self.tavily: AsyncTavilyClient | None = None
+
+
+def _async_http_state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    if loop not in _async_http:
+        _async_http[loop] = _LoopState()
+    return _async_http[loop]
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the pooled async HTTP client for the running event loop."""
+    return _async_http_state().http
+
+
+def _async_host_slot(url: str) -> asyncio.Semaphore:
+    host = httpx.URL(url).host
+    slots = _async_http_state().host_slots
+    if host not in slots:
+        slots[host] = asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+    return slots[host]
+
+
+# ── Search client ─────────────────────────────────────────────────────────────
+
+_tavily_client: TavilyClient | None = None
+
+
+def _get_tavily_client() -> TavilyClient:
+    global _tavily_client
+    if _tavily_client is None:
+        _tavily_client = TavilyClient(api_key=os.environ["TAVILY_API_KEY"])
+    return _tavily_client
+
+
+def _get_async_tavily_client() -> AsyncTavilyClient:
+    """Return the async Tavily client for the running event loop."""
+    state = _async_http_state()
+    if state.tavily is None:
+        state.tavily = AsyncTavilyClient(api_key=os.environ["TAVILY_API_KEY"])
+    return state.tavily
 
 
 # ── Tool implementations ──────────────────────────────────────────────────────
 
-def search(query: str) -> str:
+def search(query: str, max_results: int = 5) -> str:
     """Search the web using Tavily and return formatted results."""
-    client = TavilyClient(api_key=os.environ["TAVILY_API_KEY"])
-    response = client.search(query, max_results=5)
+    response = SEARCH_CACHE.get(query, max_results)
+    if response is None:
+        def call():
+            TAVILY_LIMITER.acquire()
+            return _get_tavily_client().search(query, max_results=max_results)
 
+        try:
+            response = retry_call(call, on_retry=log_retry("search"))
+        except Exception as e:
+            return f"Error searching for {query!r}: {e}"
+        SEARCH_CACHE.put(query, max_results, response)
+    return _format_results(response)
+
+
+def _format_results(response: dict) -> str:
     formatted = []
     for result in response["results"]:
         formatted.append(
@@ -33,34 +167,269 @@ def search(query: str) -> str:
     return "\n\n---\n\n".join(formatted)
 
 
+_RESULT_URL = re.compile(r"^URL: (\S+)$", re.MULTILINE)
+
+
+def result_urls(results: str) -> list[str]:
+    """URLs from a search() result, in rank order."""
+    return _RESULT_URL.findall(results)
+
+
 def fetch_page(url: str) -> str:
     """Fetch the text content of a web page, stripping HTML."""
+    cached = PAGE_CACHE.get(url)
+    if cached and cached.fresh:
+        return cached.text
+
     try:
-        resp = httpx.get(url, follow_redirects=True, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        for tag in soup(["script", "style", "nav", "footer"]):
-            tag.decompose()
-        text = soup.get_text(separator="\n", strip=True)
-        # Truncate to avoid blowing up the context window
-        return text[:8000]
+        host = httpx.URL(url).host
+        return retry_call(
+            lambda: _fetch(url, cached),
+            breaker=HOST_BREAKER if host else None,  # no host: the URL is bad, not the server
+            key=host,
+            on_retry=log_retry(f"fetch {url}"),
+        )
     except Exception as e:
         return f"Error fetching {url}: {e}"
 
 
+def _fetch(url: str, cached) -> str:
+    headers = cached.validators() if cached else {}
+    with _host_slot(url), get_http_client().stream("GET", url, headers=headers) as resp:
+        if cached and resp.status_code == 304:
+            PAGE_CACHE.refresh(cached)
+            return cached.text
+        resp.raise_for_status()
+        text = _read_text(resp)
+    _cache_page(url, resp, text)
+    return text
+
+
+def _read_text(resp: httpx.Response) -> str:
+    """Parse a streamed response, stopping once the text budget is met.
+
+    Full-document backends (see extract.py) need the whole body, up to MAX_BYTES.
+    """
+    if BACKEND != "stream":
+        chunks = []
+        for chunk in resp.iter_text():
+            chunks.append(chunk)
+            if resp.num_bytes_downloaded >= MAX_BYTES:
+                break
+        return BACKENDS[BACKEND]("".join(chunks))
+
+    parser = TextExtractor()
+    for chunk in resp.iter_text():
+        parser.feed(chunk)
+        if parser.done or resp.num_bytes_downloaded >= MAX_BYTES:
+            break
+    return parser.text()
+
+
+def _cache_page(url: str, resp: httpx.Response, text: str) -> None:
+    PAGE_CACHE.put(
+        url,
+        text,
+        etag=resp.headers.get("etag"),
+        last_modified=resp.headers.get("last-modified"),
+    )
+
+
 def write_report(filename: str, content: str) -> str:
-    """Write the final report to disk. Calling this ends the research session."""
-    reports_dir = Path(__file__).parent / "reports"
-    reports_dir.mkdir(exist_ok=True)
+    """Write the final report to disk. Calling this ends the research session.
+
+    Safe for many sessions sharing REPORTS_DIR: the report is written to a temp
+    file and linked into place under a name nobody else has taken, so it never
+    overwrites another report and is never seen half-written. Content identical
+    to an existing report is not written twice.
+    """
+    REPORTS_DIR.mkdir(exist_ok=True)
 
-    if not filename.endswith(".md"):
-        filename += ".md"
+    stem = Path(filename).name  # the model picks the name; keep it inside REPORTS_DIR
+    if stem.endswith(".md"):
+        stem = stem[:-3]
 
-    path = reports_dir / filename
-    path.write_text(content, encoding="utf-8")
+    data = content.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    existing = _report_with_digest(digest)
+    if existing:
+        return f"Report already written (identical content): {existing}"
+
+    fd, tmp = tempfile.mkstemp(dir=REPORTS_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        path, new = _publish_report(Path(tmp), stem, digest)
+    finally:
+        os.unlink(tmp)
+
+    if not new:
+        return f"Report already written (identical content): {path}"
+    REPORT_INDEX.add(path, content)
     return f"Report written to: {path}"
 
 
+def _publish_report(tmp: Path, stem: str, digest: str) -> tuple[Path, bool]:
+    """Link tmp into REPORTS_DIR as stem.md, or stem-2.md, stem-3.md, ... if taken.
+
+    os.link fails if the name exists, so claiming a name is atomic even across
+    processes. Returns (path, False) if a report with this content already holds
+    one of the names.
+    """
+    for n in range(1, 1000):
+        path = REPORTS_DIR / (f"{stem}.md" if n == 1 else f"{stem}-{n}.md")
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            if _report_digest(path) == digest:
+                return path, False
+            continue
+        _write_digest(path, digest)
+        return path, True
+    raise FileExistsError(f"no free report name for {stem!r}")
+
+
+def _digest_path(report: Path) -> Path:
+    return report.with_name(report.name + ".sha256")
+
+
+def _write_digest(report: Path, digest: str) -> None:
+    # sha256sum format, so `sha256sum -c *.sha256` verifies the reports
+    fd, tmp = tempfile.mkstemp(dir=report.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(f"{digest}  {report.name}\n")
+    os.replace(tmp, _digest_path(report))
+
+
+def _report_digest(report: Path) -> str | None:
+    try:
+        return _digest_path(report).read_text(encoding="utf-8").split()[0]
+    except (OSError, IndexError):
+        pass
+    # No sidecar: an older report, or one whose sidecar is still being written
+    try:
+        return hashlib.sha256(report.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _report_with_digest(digest: str) -> Path | None:
+    """An existing report with exactly this content, if any."""
+    for sidecar in REPORTS_DIR.glob("*.md.sha256"):
+        report = sidecar.with_suffix("")
+        if report.exists() and _report_digest(report) == digest:
+            return report
+    return None
+
+
+def search_past_reports(query: str, max_results: int = 5) -> str:
+    """Full-text search over reports written in earlier sessions."""
+    try:
+        matches = REPORT_INDEX.search(query, limit=max_results)
+    except Exception as e:
+        return f"Error searching past reports for {query!r}: {e}"
+    if not matches:
+        return f"No past reports match {query!r}."
+
+    formatted = []
+    for match in matches:
+        formatted.append(
+            f"**{match['title']}**\n"
+            f"Report: {match['name']}\n"
+            f"Match: {match['snippet']}\n\n"
+            f"{match['excerpt']}"
+        )
+    return "\n\n---\n\n".join(formatted)
+
+
+# ── Async tool implementations ────────────────────────────────────────────────
+# Same tools for scout.arun(). Network I/O is awaited, so one event loop can
+# drive many sessions without a thread per session. Page and search cache
+# lookups and writes (disk files, SQLite) run in asyncio.to_thread so they don't
+# stall the other sessions on the loop.
+
+async def asearch(query: str, max_results: int = 5) -> str:
+    """Async variant of search()."""
+    response = await asyncio.to_thread(SEARCH_CACHE.get, query, max_results)
+    if response is None:
+        async def call():
+            await TAVILY_LIMITER.aacquire()
+            return await _get_async_tavily_client().search(query, max_results=max_results)
+
+        try:
+            response = await aretry_call(call, on_retry=log_retry("search"))
+        except Exception as e:
+            return f"Error searching for {query!r}: {e}"
+        await asyncio.to_thread(SEARCH_CACHE.put, query, max_results, response)
+    return _format_results(response)
+
+
+async def afetch_page(url: str) -> str:
+    """Async variant of fetch_page()."""
+    cached = await asyncio.to_thread(PAGE_CACHE.get, url)
+    if cached and cached.fresh:
+        return cached.text
+
+    try:
+        host = httpx.URL(url).host
+        return await aretry_call(
+            lambda: _afetch(url, cached),
+            breaker=HOST_BREAKER if host else None,
+            key=host,
+            on_retry=log_retry(f"fetch {url}"),
+        )
+    except Exception as e:
+        return f"Error fetching {url}: {e}"
+
+
+async def _afetch(url: str, cached) -> str:
+    headers = cached.validators() if cached else {}
+    client = get_async_http_client()
+    async with _async_host_slot(url), client.stream("GET", url, headers=headers) as resp:
+        if cached and resp.status_code == 304:
+            await asyncio.to_thread(PAGE_CACHE.refresh, cached)
+            return cached.text
+        resp.raise_for_status()
+        text = await _aread_text(resp)
+    await asyncio.to_thread(_cache_page, url, resp, text)
+    return text
+
+
+async def _aread_text(resp: httpx.Response) -> str:
+    """Async variant of _read_text().
+
+    The stream parser runs on the event loop, one network chunk at a time; each
+    chunk parses in well under a millisecond.
+    """
+    if BACKEND != "stream":
+        chunks = []
+        async for chunk in resp.aiter_text():
+            chunks.append(chunk)
+            if resp.num_bytes_downloaded >= MAX_BYTES:
+                break
+        # A full-document parse is CPU-bound — keep it off the event loop
+        return await asyncio.to_thread(BACKENDS[BACKEND], "".join(chunks))
+
+    parser = TextExtractor()
+    async for chunk in resp.aiter_text():
+        parser.feed(chunk)
+        if parser.done or resp.num_bytes_downloaded >= MAX_BYTES:
+            break
+    return parser.text()
+
+
+async def awrite_report(filename: str, content: str) -> str:
+    """Async variant of write_report()."""
+    return await asyncio.to_thread(write_report, filename, content)
+
+
+async def asearch_past_reports(query: str, max_results: int = 5) -> str:
+    """Async variant of search_past_reports()."""
+    return await asyncio.to_thread(search_past_reports, query, max_results)
+
+
 # ── Tool schemas ──────────────────────────────────────────────────────────────
 # These are the JSON definitions passed to the Anthropic API.
 # The model reads these to understand what each tool does and what inputs it takes.
@@ -101,6 +470,25 @@ TOOL_SCHEMAS = [
             "required": ["url"],
         },
     },
+    {
+        "name": "search_past_reports",
+        "description": (
+            "Search the reports written in earlier research sessions. "
+            "Returns matching reports with a snippet and their opening section. "
+            "Check this before searching the web: if a past report already covers "
+            "part of the question, build on it instead of researching it again."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Keywords to look for in past reports",
+                }
+            },
+            "required": ["query"],
+        },
+    },
     {
         "name": "write_report",
         "description": (
@@ -129,5 +517,14 @@ TOOL_SCHEMAS = [
 TOOL_DISPATCH = {
     "search": search,
     "fetch_page": fetch_page,
+    "search_past_reports": search_past_reports,
     "write_report": write_report,
 }
+
+# Async counterparts of TOOL_DISPATCH. Used in the dispatch loop in scout.arun().
+ASYNC_TOOL_DISPATCH = {
+    "search": asearch,
+    "fetch_page": afetch_page,
+    "search_past_reports": asearch_past_reports,
+    "write_report": awrite_report,
+}
@@ -0,0 +1,221 @@
+"""
+Retries and circuit breaking for calls to external services.
+
+Shared by research-scout and deep-dispatch. One transient 429 or 502 should not
+throw away a whole session's work, and a dead host should not keep eating
+fetch attempts.
+
+  retry_call / aretry_call
+    Retries a callable on transient failures: connection errors, timeouts,
+    408/425/429/5xx. Backoff is exponential with full jitter, Retry-After is
+    honored, and the total time spent waiting is capped.
+
+  CircuitBreaker
+    Counts consecutive failed calls per key (e.g. per host); a call has failed
+    once its retries are used up. After `threshold` failed calls the circuit
+    opens and calls fail fast with CircuitOpenError for `cooldown` seconds.
+    Then a single trial call is let through.
+
+Errors are classified by duck typing, so this module imports none of the SDKs:
+status codes come from `.status_code`, `.code` or `.response.status_code`.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import TypeVar
+
+T = TypeVar("T")
+
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504, 529}
+
+# Exception class names (anywhere in the MRO) that mean "try again"
+TRANSIENT_ERRORS = {
+    "ConnectionError",       # builtin, requests
+    "TimeoutError",          # builtin
+    "Timeout",               # requests
+    "TransportError",        # httpx: connect/read/write errors and timeouts
+    "APIConnectionError",    # anthropic, including APITimeoutError
+    "RemoteDisconnected",
+    "UsageLimitExceededError",  # tavily: raised for HTTP 429, with no status attribute
+}
+
+# Subclasses of the above that retrying can't fix: the request itself is bad
+PERMANENT_ERRORS = {
+    "UnsupportedProtocol",   # httpx: missing or unknown URL scheme
+    "LocalProtocolError",    # httpx: we sent something invalid
+    "InvalidURL",            # httpx, requests
+}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay: float = 0.5     # seconds before the first retry
+    max_delay: float = 30.0     # cap on any single wait
+    max_total: float = 90.0     # cap on total time spent waiting
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = 3, cooldown: float = 60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: dict[str, int] = {}
+        self._opened: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def check(self, key: str) -> None:
+        """Raise CircuitOpenError if key's circuit is open."""
+        with self._lock:
+            opened = self._opened.get(key)
+            if opened is None:
+                return
+            if time.monotonic() - opened < self.cooldown:
+                raise CircuitOpenError(f"{key} is failing; not retrying for now")
+            # Half-open: let this call through as a trial, and re-open on failure
+            del self._opened[key]
+            self._failures[key] = self.threshold - 1
+
+    def success(self, key: str) -> None:
+        with self._lock:
+            self._failures.pop(key, None)
+            self._opened.pop(key, None)
+
+    def failure(self, key: str) -> None:
+        with self._lock:
+            self._failures[key] = self._failures.get(key, 0) + 1
+            if self._failures[key] >= self.threshold:
+                self._opened[key] = time.monotonic()
+
+
+# ── Classification ────────────────────────────────────────────────────────────
+
+def status_code(exc: BaseException) -> int | None:
+    for value in (
+        getattr(exc, "status_code", None),
+        getattr(exc, "code", None),
+        getattr(getattr(exc, "response", None), "status_code", None),
+    ):
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_transient(exc: BaseException) -> bool:
+    status = status_code(exc)
+    if status is not None:
+        return status in RETRY_STATUSES
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    return not names & PERMANENT_ERRORS and bool(names & TRANSIENT_ERRORS)
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds the server asked us to wait, from a Retry-After header."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _delay(policy: RetryPolicy, attempt: int, exc: BaseException) -> float:
+    requested = retry_after(exc)
+    if requested is not None:
+        return min(requested, policy.max_delay)
+    # Full jitter: uniform over [0, base * 2^attempt]
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** attempt))
+
+
+# ── Retry ─────────────────────────────────────────────────────────────────────
+
+def retry_call(
+    fn: Callable[[], T],
+    policy: RetryPolicy = DEFAULT_POLICY,
+    breaker: CircuitBreaker | None = None,
+    key: str = "",
+    on_retry: Callable[[int, BaseException, float], None] | None = None,
+) -> T:
+    """Call fn(), retrying transient failures according to policy."""
+    waited = 0.0
+    for attempt in range(policy.max_attempts):
+        if breaker:
+            breaker.check(key)
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            delay = _delay(policy, attempt, e)
+            if attempt + 1 == policy.max_attempts or waited + delay > policy.max_total:
+                # One failure per call that ran out of retries, not per attempt
+                if breaker:
+                    breaker.failure(key)
+                raise
+            if on_retry:
+                on_retry(attempt + 1, e, delay)
+            time.sleep(delay)
+            waited += delay
+        else:
+            if breaker:
+                breaker.success(key)
+            return result
+    raise AssertionError("unreachable")
+
+
+async def aretry_call(
+    fn: Callable[[], Awaitable[T]],
+    policy: RetryPolicy = DEFAULT_POLICY,
+    breaker: CircuitBreaker | None = None,
+    key: str = "",
+    on_retry: Callable[[int, BaseException, float], None] | None = None,
+) -> T:
+    """Async variant of retry_call(). fn is called afresh for each attempt."""
+    waited = 0.0
+    for attempt in range(policy.max_attempts):
+        if breaker:
+            breaker.check(key)
+        try:
+            result = await fn()
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            delay = _delay(policy, attempt, e)
+            if attempt + 1 == policy.max_attempts or waited + delay > policy.max_total:
+                # One failure per call that ran out of retries, not per attempt
+                if breaker:
+                    breaker.failure(key)
+                raise
+            if on_retry:
+                on_retry(attempt + 1, e, delay)
+            await asyncio.sleep(delay)
+            waited += delay
+        else:
+            if breaker:
+                breaker.success(key)
+            return result
+    raise AssertionError("unreachable")
+
+
+def log_retry(label: str) -> Callable[[int, BaseException, float], None]:
+    """on_retry callback that prints one line per retry."""
+    def on_retry(attempt: int, exc: BaseException, delay: float) -> None:
+        print(f"  ↻ {label}: {type(exc).__name__} — retry {attempt} in {delay:.1f}s")
+    return on_retry